@@ -10,6 +10,7 @@ Output: data/ports-top-5000.txt (comma-separated, single line)
 """
 from __future__ import annotations
 
+import itertools
 from pathlib import Path
 
 
@@ -47,40 +48,12 @@ SEED_PORTS = [
 
 
 def build_top_5000() -> list[int]:
-    seen: set[int] = set()
-    ordered: list[int] = []
-
-    def add(p: int):
-        if 1 <= p <= 65535 and p not in seen:
-            seen.add(p)
-            ordered.append(p)
-
-    # Seed curated ports (dedup automatically)
-    for p in SEED_PORTS:
-        add(p)
-
-    # Add Nmap-inspired popular ranges
-    popular_ranges = [
-        range(1, 1024),  # well-known
-        range(1024, 2000),
-        range(2000, 3000),
-        range(3000, 4000),
-        range(4000, 5000),
-        range(5000, 10000),
-        range(10000, 20000),
-        range(20000, 30000),
-        range(30000, 40000),
-        range(40000, 50000),
-        range(50000, 60000),
-        range(60000, 65536),
-    ]
-    for rng in popular_ranges:
-        for p in rng:
-            if len(ordered) >= 5000:
-                return ordered
-            add(p)
-
-    return ordered[:5000]
+    # Curated seeds first, then ascending well-known and registered ports
+    pool = itertools.chain(SEED_PORTS, range(1, 65536))
+    valid = (p for p in pool if 1 <= p <= 65535)
+    # dict.fromkeys dedups in insertion order; islice stops the scan once enough
+    # candidates are drawn (seed/range overlap is far below the 4x headroom)
+    return list(dict.fromkeys(itertools.islice(valid, 5000 * 4)))[:5000]
 
 
 def main() -> None:
@@ -45,7 +45,7 @@ mods = [
     ('httpx', 'httpx'),
     ('jinja2', 'jinja2'),
     ('whois', 'python-whois'),
-    ('bs4', 'beautifulsoup4'),
+    ('orjson', 'orjson'),
     ('requests', 'requests'),
     ('socks', 'PySocks'),
     ('stem', 'stem'),
@@ -6,4 +6,10 @@ __all__ = [
     "__version__",
 ]
 
-from .scan import scan_domain, scan_ip
+
+def __getattr__(name: str):
+    # Defer the heavy scan import chain (httpx, dnspython) until first use
+    if name in ("scan_domain", "scan_ip"):
+        from . import scan
+        return getattr(scan, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
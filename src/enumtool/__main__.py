@@ -3,11 +3,8 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from rich.console import Console
 from . import __version__
 
-from .scan import scan_domain, scan_ip
-
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="EnumTool - domain enumeration and fingerprinting")
@@ -21,13 +18,22 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--max-workers", type=int, default=200, help="Concurrency level (default: 200)")
     p.add_argument("--timeout", type=float, default=5.0, help="Timeout seconds (default: 5)")
     p.add_argument("--active", action="store_true", help="Enable active probing (TCP connect/HTTP). Default is passive OSINT only.")
+    p.add_argument("--backend", choices=["asyncio", "nmap", "masscan"], default="asyncio", help="TCP port scanner for --active: built-in asyncio connect scan (default), or one nmap/masscan run over all IPv4 targets (falls back to asyncio if unavailable; not used with --anon)")
     p.add_argument("--anon", action="store_true", help="Route requests via Tor and use DoH; disables WHOIS; active probing, if enabled, runs over Tor.")
     p.add_argument("--no-json", action="store_true", help="Do not write JSON output")
+    p.add_argument("--no-cache", dest="cache", action="store_false", default=None, help="Do not read or write the on-disk cache of passive-source responses")
+    p.add_argument("--cache", dest="cache", action="store_true", help="Use the on-disk cache even with --anon (off by default there: it records every target locally)")
+    p.add_argument("--refresh", action="store_true", help="Ignore cached passive-source responses and refetch (the cache is updated)")
+    p.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
     return p.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+    # Heavy imports are deferred so --help/--version return immediately
+    from rich.console import Console
+    from .scan import scan_domain, scan_ip
+
     console = Console()
     # ASCII banner
     banner = r"""
@@ -61,6 +67,9 @@ def main() -> None:
                 active=args.active,
                 progress=progress,
                 anon=args.anon,
+                cache=args.cache,
+                refresh=args.refresh,
+                backend=args.backend,
             )
         else:
             report = scan_domain(
@@ -76,6 +85,9 @@ def main() -> None:
             bruteforce=args.bruteforce,
             progress=progress,
             anon=args.anon,
+            cache=args.cache,
+            refresh=args.refresh,
+            backend=args.backend,
             )
     except RuntimeError as e:
         console.print(f"[red]Error:[/] {e}")
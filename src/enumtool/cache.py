@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import orjson
+
+# Warm re-runs against the same target skip the network for passive sources
+CACHE_DIR = Path(os.getenv("ENUMTOOL_CACHE_DIR") or Path.home() / ".cache" / "enumtool")
+DEFAULT_TTL = 6 * 3600
+WHOIS_TTL = 24 * 3600
+
+_read = True
+_write = True
+
+
+def configure(enabled: bool = True, refresh: bool = False) -> None:
+    """enabled=False bypasses the cache entirely; refresh=True ignores stored entries but rewrites them."""
+    global _read, _write
+    _read = enabled and not refresh
+    _write = enabled
+
+
+def _path(namespace: str, key_parts: tuple) -> Path:
+    digest = hashlib.blake2b(orjson.dumps([namespace, *key_parts]), digest_size=16).hexdigest()
+    return CACHE_DIR / namespace / f"{digest}.json"
+
+
+def _load(path: Path) -> Optional[Any]:
+    if not _read:
+        return None
+    try:
+        entry = orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    if not isinstance(entry, dict) or entry.get("expires", 0) < time.time():
+        return None
+    return entry.get("value")
+
+
+def json_default(obj: Any) -> Any:
+    """orjson `default` hook shared with result.json: sets encode as sorted lists."""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError
+
+
+def _store(path: Path, value: Any, ttl: float) -> None:
+    # Empty results are usually failures or missing keys: don't pin them for a whole TTL
+    if not _write or not value:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(orjson.dumps({"expires": time.time() + ttl, "value": value}, default=json_default))
+        tmp.replace(path)
+    except (OSError, TypeError):
+        pass
+
+
+def _key_parts(args: tuple, kwargs: dict) -> tuple:
+    # Only plain data identifies a request; clients and `self` are transport, not key
+    plain = (str, int, float, bool, type(None), dict, list, tuple)
+    return (
+        tuple(a for a in args if isinstance(a, plain)),
+        {k: v for k, v in sorted(kwargs.items()) if isinstance(v, plain)},
+    )
+
+
+def cached(namespace: str, ttl: float = DEFAULT_TTL, decode: Optional[Callable[[Any], Any]] = None) -> Callable:
+    """Disk-cache a sync or async function's JSON-serializable result for ``ttl`` seconds.
+    Values come back as decoded JSON (tuples and sets as lists) unless ``decode`` rebuilds them.
+    """
+    def deco(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                path = _path(namespace, _key_parts(args, kwargs))
+                # File I/O stays off the event loop
+                hit = await asyncio.to_thread(_load, path) if _read else None
+                if hit is not None:
+                    return decode(hit) if decode else hit
+                value = await fn(*args, **kwargs)
+                if _write and value:
+                    await asyncio.to_thread(_store, path, value, ttl)
+                return value
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            path = _path(namespace, _key_parts(args, kwargs))
+            hit = _load(path)
+            if hit is not None:
+                return decode(hit) if decode else hit
+            value = fn(*args, **kwargs)
+            _store(path, value, ttl)
+            return value
+        return wrapper
+
+    return deco
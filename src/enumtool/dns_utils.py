@@ -1,24 +1,42 @@
 from __future__ import annotations
 
 import asyncio
-from typing import List, Tuple, Optional
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple, Optional, TypeVar
 import ipaddress
+from contextvars import ContextVar
+import dns.name
 import dns.reversename
 
 import dns.asyncresolver
+import dns.message
 import dns.resolver
 import httpx
 
+from .pool import run_pool
+
 
 async def _query(resolver: dns.asyncresolver.Resolver, name: str, rtype: str) -> List[str]:
     try:
         ans = await resolver.resolve(name, rtype, lifetime=3.0)
-        return [str(r.to_text()).strip() for r in ans]
+        if rtype == "TXT":
+            return [r.to_text().strip() for r in ans]
+        return [r.to_text() for r in ans]
     except Exception:
         return []
 
 
+T = TypeVar("T")
+
+_RESOLVER: Optional[dns.asyncresolver.Resolver] = None
+
+
 def build_resolver() -> dns.asyncresolver.Resolver:
+    """Return the process-wide resolver, building it on first use.
+    Sharing it lets its LRU cache absorb repeated NS/CNAME lookups during bruteforce.
+    """
+    global _RESOLVER
+    if _RESOLVER is not None:
+        return _RESOLVER
     r = dns.asyncresolver.Resolver()
     # Reasonable public resolvers fallback
     r.nameservers = [
@@ -27,10 +45,39 @@ def build_resolver() -> dns.asyncresolver.Resolver:
         "9.9.9.9",
     ]
     r.lifetime = 3.0
+    r.cache = dns.resolver.LRUCache(10000)
+    _RESOLVER = r
     return r
 
 
+# Per-scan memo of full record walks, keyed by (transport, name). Unset outside a scan.
+_DNS_MEMO: ContextVar[Optional[Dict[Tuple[str, str], "asyncio.Future"]]] = ContextVar("enumtool_dns_memo", default=None)
+
+
+def begin_dns_memo() -> None:
+    """Start a fresh memo for the current scan; tasks it spawns share it.
+    The apex is otherwise walked three times (apex records, passive hints, resolve-all).
+    """
+    _DNS_MEMO.set({})
+
+
+async def _memoized(kind: str, name: str, fetch: Callable[[], Awaitable[T]]) -> T:
+    memo = _DNS_MEMO.get()
+    if memo is None:
+        return await fetch()
+    key = (kind, name.lower().rstrip("."))
+    fut = memo.get(key)
+    if fut is None:
+        fut = memo[key] = asyncio.ensure_future(fetch())
+    # Shielded: one cancelled caller must not cancel the lookup others are awaiting
+    return await asyncio.shield(fut)
+
+
 async def enumerate_dns(name: str) -> Tuple[List[str], List[str], List[str], List[str], List[str], List[str], List[str]]:
+    return await _memoized("dns", name, lambda: _enumerate_dns(name))
+
+
+async def _enumerate_dns(name: str) -> Tuple[List[str], List[str], List[str], List[str], List[str], List[str], List[str]]:
     resolver = build_resolver()
     a, aaaa, cname, txt, mx, ns, srv = await asyncio.gather(
         _query(resolver, name, "A"),
@@ -44,39 +91,128 @@ async def enumerate_dns(name: str) -> Tuple[List[str], List[str], List[str], Lis
     return a, aaaa, cname, txt, mx, ns, srv
 
 
+_DOH_URL = "https://cloudflare-dns.com/dns-query"
+_DOH_HEADERS = {"accept": "application/dns-message", "content-type": "application/dns-message"}
+
+
+def build_doh_client(timeout: float = 5.0) -> httpx.AsyncClient:
+    """Client used for DoH when the caller does not supply one.
+    HTTP/2 lets all record-type queries multiplex over a single connection.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=timeout,
+        limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+    )
+
+
+async def _doh_query(client: httpx.AsyncClient, name: str, rtype: str) -> List[str]:
+    """RFC 8484 query: POST the DNS wire format rather than the larger JSON API."""
+    try:
+        q = dns.message.make_query(name, rtype)
+        q.id = 0  # recommended by RFC 8484 for cache friendliness
+        r = await client.post(_DOH_URL, content=q.to_wire(), headers=_DOH_HEADERS)
+        if r.status_code != 200:
+            return []
+        msg = dns.message.from_wire(r.content)
+        return [rd.to_text() for rrset in msg.answer for rd in rrset]
+    except Exception:
+        return []
+
+
 async def enumerate_dns_doh(name: str, client: Optional[httpx.AsyncClient] = None) -> Tuple[List[str], List[str], List[str], List[str], List[str], List[str], List[str]]:
     """Resolve DNS records using DoH (Cloudflare), suitable for Tor/anon mode.
-    Requires an httpx.AsyncClient; if not provided, a short-lived one will be used.
+    All seven record types share one client; if none is provided, a pooled HTTP/2 one is opened for the call.
     """
-    url = "https://cloudflare-dns.com/dns-query"
-    headers = {"accept": "application/dns-json"}
+    return await _memoized("doh", name, lambda: _enumerate_dns_doh(name, client))
+
+
+async def _enumerate_dns_doh(name: str, client: Optional[httpx.AsyncClient]) -> Tuple[List[str], List[str], List[str], List[str], List[str], List[str], List[str]]:
     close_client = False
     if client is None:
-        client = httpx.AsyncClient(timeout=5.0)
+        client = build_doh_client()
+        close_client = True
+    try:
+        a, aaaa, cname, txt, mx, ns, srv = await asyncio.gather(
+            *(_doh_query(client, name, t) for t in ("A", "AAAA", "CNAME", "TXT", "MX", "NS", "SRV"))
+        )
+    finally:
+        if close_client:
+            await client.aclose()
+    return a, aaaa, cname, txt, mx, ns, srv
+
+
+async def enumerate_dns_many(names: Iterable[str], concurrency: int = 100, *, anon: bool = False, client: Optional[httpx.AsyncClient] = None) -> Dict[str, Tuple[List[str], List[str], List[str], List[str], List[str], List[str], List[str]]]:
+    """Resolve many names with a fixed pool of `concurrency` workers.
+    Plain DNS shares the cached resolver; DoH (anon) shares a single client.
+    Returns a mapping name -> (a, aaaa, cname, txt, mx, ns, srv) in input order;
+    names whose lookup raised are omitted.
+    """
+    name_list = list(dict.fromkeys(names))
+    close_client = False
+    if anon and client is None:
+        client = build_doh_client()
         close_client = True
-    async def q(t: str) -> List[str]:
+    try:
+        if anon:
+            results = await run_pool(name_list, lambda n: enumerate_dns_doh(n, client), concurrency)
+        else:
+            results = await run_pool(name_list, enumerate_dns, concurrency)
+    finally:
+        if close_client:
+            await client.aclose()
+    return {name: res for name, res in zip(name_list, results) if res is not None}
+
+
+async def name_exists(name: str) -> bool:
+    """Cheap existence check: one A query (CNAME chains are followed), AAAA only on NoAnswer.
+    Like the full record walk it replaces, a dangling CNAME still counts as existing.
+    """
+    resolver = build_resolver()
+    for rtype in ("A", "AAAA"):
         try:
-            r = await client.get(url, params={"name": name, "type": t}, headers=headers)
-            if r.status_code != 200:
-                return []
-            data = r.json()
-            ans = data.get("Answer") or []
-            out: List[str] = []
-            for rr in ans:
-                if not isinstance(rr, dict):
-                    continue
-                d = rr.get("data")
-                if isinstance(d, str):
-                    out.append(d)
-            return out
+            await resolver.resolve(name, rtype)
+            return True
+        except dns.resolver.NXDOMAIN as e:
+            # NXDOMAIN reached through a CNAME: the alias itself exists
+            try:
+                return e.canonical_name != dns.name.from_text(name)
+            except Exception:
+                return False
+        except dns.resolver.NoAnswer:
+            continue
         except Exception:
-            return []
-    a, aaaa, cname, txt, mx, ns, srv = await asyncio.gather(
-        q("A"), q("AAAA"), q("CNAME"), q("TXT"), q("MX"), q("NS"), q("SRV")
-    )
-    if close_client:
-        await client.aclose()
-    return a, aaaa, cname, txt, mx, ns, srv
+            return False
+    # Name exists without addresses; keep it only if it is an alias
+    return bool(await _query(resolver, name, "CNAME"))
+
+
+async def _doh_name_exists(client: httpx.AsyncClient, name: str) -> bool:
+    # The answer section carries any CNAME chain, so a non-empty A reply covers aliases too
+    for rtype in ("A", "AAAA", "CNAME"):
+        if await _doh_query(client, name, rtype):
+            return True
+    return False
+
+
+async def resolve_existing_many(names: Iterable[str], concurrency: int = 200, *, anon: bool = False, client: Optional[httpx.AsyncClient] = None) -> List[str]:
+    """Bulk existence check for bruteforce candidates: return the names that resolve, in input order.
+    Costs one or two queries per name instead of the seven of enumerate_dns.
+    """
+    name_list = list(dict.fromkeys(names))
+    close_client = False
+    if anon and client is None:
+        client = build_doh_client()
+        close_client = True
+    try:
+        if anon:
+            found = await run_pool(name_list, lambda n: _doh_name_exists(client, n), concurrency)
+        else:
+            found = await run_pool(name_list, name_exists, concurrency)
+    finally:
+        if close_client:
+            await client.aclose()
+    return [name for name, ok in zip(name_list, found) if ok]
 
 
 async def ptr_lookup(ip: str, *, anon: bool = False, client: Optional[httpx.AsyncClient] = None) -> List[str]:
@@ -100,28 +236,12 @@ async def ptr_lookup(ip: str, *, anon: bool = False, client: Optional[httpx.Asyn
         except Exception:
             return []
     # DoH path
-    url = "https://cloudflare-dns.com/dns-query"
-    headers = {"accept": "application/dns-json"}
     close_client = False
     if client is None:
-        client = httpx.AsyncClient(timeout=5.0)
+        client = build_doh_client()
         close_client = True
     try:
-        r = await client.get(url, params={"name": name, "type": "PTR"}, headers=headers)
-        if r.status_code != 200:
-            return []
-        data = r.json()
-        ans = data.get("Answer") or []
-        out: List[str] = []
-        for rr in ans:
-            if not isinstance(rr, dict):
-                continue
-            d = rr.get("data")
-            if isinstance(d, str):
-                out.append(d.rstrip('.'))
-        return out
-    except Exception:
-        return []
+        return [d.rstrip('.') for d in await _doh_query(client, name, "PTR")]
     finally:
         if close_client:
             await client.aclose()
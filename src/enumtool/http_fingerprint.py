@@ -1,100 +1,150 @@
 from __future__ import annotations
 
 import hashlib
-from typing import Dict, List, Optional
+import html as htmllib
+import re
+from typing import Dict, Optional, Set, Tuple
 
 import httpx
-from bs4 import BeautifulSoup
 
 
-async def fetch(url: str, timeout: float = 5.0, client: Optional[httpx.AsyncClient] = None) -> Optional[httpx.Response]:
+_TITLE_RE = re.compile(rb"<title[^>]*>([^<]*)</title>", re.I | re.S)
+# Body substring -> technology; matched together in a single pass (keys lowercase)
+_BODY_SIGNATURES: Dict[bytes, str] = {
+    b"/wp-content/": "WordPress",
+    b"/wp-includes/": "WordPress",
+    b"/sites/default/files/": "Drupal",
+    b"/components/com_": "Joomla",
+    b"/_next/": "Next.js",
+    b"/_nuxt/": "Nuxt.js",
+    b"data-reactroot": "React",
+    b"ng-version=": "Angular",
+}
+_SIGNATURE_RE = re.compile(b"|".join(re.escape(sig) for sig in _BODY_SIGNATURES), re.I)
+_GENERATOR_RE = re.compile(rb"""<meta[^>]+name\s*=\s*["']?generator""", re.I)
+
+
+def build_http_client(timeout: float = 5.0) -> httpx.AsyncClient:
+    """Pooled client for fingerprinting; the page and its favicon share keep-alive connections."""
+    return httpx.AsyncClient(
+        http2=True,
+        follow_redirects=True,
+        timeout=timeout,
+        headers={"User-Agent": "EnumTool/1.0"},
+        limits=httpx.Limits(max_keepalive_connections=64),
+    )
+
+
+# Title, generator meta and asset paths live near the top of the page
+MAX_BODY_BYTES = 64 * 1024
+MAX_FAVICON_BYTES = 1024 * 1024
+
+
+async def _read_capped(resp: httpx.Response, limit: int) -> bytes:
+    buf = bytearray()
+    async for chunk in resp.aiter_bytes():
+        buf += chunk
+        if len(buf) >= limit:
+            break
+    return bytes(buf[:limit])
+
+
+async def fetch(client: httpx.AsyncClient, url: str, timeout: float = 5.0) -> Optional[Tuple[httpx.Response, bytes]]:
+    """GET url and return (response, first MAX_BODY_BYTES of the body)."""
     try:
-        if client is None:
-            async with httpx.AsyncClient(http2=True, follow_redirects=True, timeout=timeout, headers={
-                "User-Agent": "EnumTool/1.0"
-            }) as ac:
-                resp = await ac.get(url)
-                return resp
-        else:
-            resp = await client.get(url)
-            return resp
+        async with client.stream("GET", url, timeout=timeout) as resp:
+            body = await _read_capped(resp, MAX_BODY_BYTES)
+        return resp, body
     except Exception:
         return None
 
 
-async def favicon_hash(url: str, timeout: float = 5.0, client: Optional[httpx.AsyncClient] = None) -> Optional[str]:
+async def favicon_hash(client: httpx.AsyncClient, url: str, timeout: float = 5.0) -> Optional[str]:
     # naive: try /favicon.ico
     base = url.rstrip("/")
     fav_url = base + "/favicon.ico"
     try:
-        if client is None:
-            async with httpx.AsyncClient(http2=True, follow_redirects=True, timeout=timeout) as ac:
-                r = await ac.get(fav_url)
-        else:
-            r = await client.get(fav_url)
-            if r.status_code == 200 and r.content:
-                return hashlib.sha1(r.content).hexdigest()
+        # Identifier only, not an integrity check: BLAKE2b is faster than SHA-1 on 64-bit CPUs
+        h = hashlib.blake2b(digest_size=16)
+        size = 0
+        async with client.stream("GET", fav_url, timeout=timeout) as r:
+            if r.status_code != 200:
+                return None
+            # Hash chunks as they arrive instead of buffering the whole icon
+            async for chunk in r.aiter_bytes(65536):
+                h.update(chunk[:MAX_FAVICON_BYTES - size])
+                size += len(chunk)
+                if size >= MAX_FAVICON_BYTES:
+                    break
+        if size:
+            return h.hexdigest()
     except Exception:
         return None
     return None
 
 
-def tech_hints_from_headers(headers: httpx.Headers) -> List[str]:
-    hints: List[str] = []
+def tech_hints_from_headers(headers: httpx.Headers) -> Set[str]:
+    hints: Set[str] = set()
     server = headers.get("server")
     powered = headers.get("x-powered-by")
     if server:
-        hints.append(f"server:{server}")
+        hints.add(f"server:{server}")
     if powered:
-        hints.append(f"powered:{powered}")
+        hints.add(f"powered:{powered}")
     if "cloudflare" in (server or "").lower():
-        hints.append("Cloudflare")
+        hints.add("Cloudflare")
     if powered and "php" in powered.lower():
-        hints.append("PHP")
+        hints.add("PHP")
     if powered and "express" in powered.lower():
-        hints.append("Node.js Express")
+        hints.add("Node.js Express")
     return hints
 
 
-def tech_hints_from_html(html: str) -> List[str]:
-    hints: List[str] = []
-    try:
-        soup = BeautifulSoup(html, "html.parser")
-        if soup.find("meta", {"name": "generator"}):
-            hints.append("Meta-Generator")
-        title = soup.title.string.strip() if soup.title and soup.title.string else None
-        if title:
-            # Just keep as info, not strong signal
-            pass
-        # WordPress fingerprint
-        if any("/wp-content/" in (tag.get("href") or tag.get("src") or "") for tag in soup.find_all(["link", "script", "img"])):
-            hints.append("WordPress")
-    except Exception:
-        pass
+def tech_hints_from_html(html: bytes) -> Set[str]:
+    """Signature checks run straight over the raw body; no DOM is built."""
+    hints = {_BODY_SIGNATURES[m.group(0).lower()] for m in _SIGNATURE_RE.finditer(html)}
+    if _GENERATOR_RE.search(html):
+        hints.add("Meta-Generator")
     return hints
 
 
+def extract_title(html: bytes, encoding: Optional[str] = None) -> Optional[str]:
+    m = _TITLE_RE.search(html)
+    if not m:
+        return None
+    raw = m.group(1)
+    try:
+        text = raw.decode(encoding or "utf-8", "replace")
+    except LookupError:
+        # Server-declared charset Python doesn't know
+        text = raw.decode("utf-8", "replace")
+    title = htmllib.unescape(text).strip()
+    return title or None
+
+
+def extract_hints_and_title(html: bytes, encoding: Optional[str] = None) -> Tuple[Set[str], Optional[str]]:
+    """Return (tech hints, title) without building a DOM."""
+    return tech_hints_from_html(html), extract_title(html, encoding)
+
+
 async def fingerprint_http(host: str, port: int, ssl: bool, timeout: float = 5.0, client: Optional[httpx.AsyncClient] = None) -> Dict[str, Optional[str]]:
     scheme = "https" if ssl else "http"
     url = f"{scheme}://{host}:{port}"
-    resp = await fetch(url, timeout=timeout, client=client)
-    if not resp:
+    if client is None:
+        async with build_http_client(timeout) as ac:
+            return await fingerprint_http(host, port, ssl, timeout=timeout, client=ac)
+    fetched = await fetch(client, url, timeout=timeout)
+    if not fetched:
         return {"url": url}
-    hints = tech_hints_from_headers(resp.headers)
-    body = resp.text if resp.content else ""
-    hints += tech_hints_from_html(body)
-    fav = await favicon_hash(url, timeout=timeout, client=client)
-    title = None
-    try:
-        soup = BeautifulSoup(body, "html.parser")
-        title = soup.title.string.strip() if soup.title and soup.title.string else None
-    except Exception:
-        pass
+    resp, body = fetched
+    html_hints, title = extract_hints_and_title(body, resp.encoding)
+    hints = tech_hints_from_headers(resp.headers) | html_hints
+    fav = await favicon_hash(client, url, timeout=timeout)
     return {
         "url": url,
         "status": str(resp.status_code),
         "server": resp.headers.get("server"),
         "title": title,
         "favicon_hash": fav,
-        "tech": ", ".join(sorted(set(hints))) if hints else None,
+        "tech": ", ".join(sorted(hints)) if hints else None,
     }
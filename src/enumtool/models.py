@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -15,7 +15,7 @@ class DNSRecords:
     srv: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class PortInfo:
     port: int
     open: bool
@@ -31,8 +31,8 @@ class HTTPInfo:
     status: Optional[int] = None
     title: Optional[str] = None
     server: Optional[str] = None
-    tech: List[str] = field(default_factory=list)
-    favicon_hash: Optional[str] = None
+    tech: Tuple[str, ...] = ()  # sorted, deduped (tech_infer.merge_tech_hints)
+    favicon_hash: Optional[str] = None  # BLAKE2b-128 hex of /favicon.ico
     redirects: List[str] = field(default_factory=list)
 
 
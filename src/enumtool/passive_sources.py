@@ -1,94 +1,122 @@
 from __future__ import annotations
 
-import json
-from typing import Dict, List, Set, Tuple, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Set, Tuple, Optional
 from urllib.parse import quote_plus
 
 import httpx
+import orjson
+try:
+    import ijson  # type: ignore
+except Exception:  # pragma: no cover - optional streaming parser
+    ijson = None  # type: ignore
 
+from .cache import cached
 from .config import get_api_key, load_env, get_settings
 
 
-async def from_crtsh(domain: str, client: Optional[httpx.AsyncClient] = None) -> List[str]:
+@asynccontextmanager
+async def _ensure_client(client: Optional[httpx.AsyncClient], timeout: float = 10.0) -> AsyncIterator[httpx.AsyncClient]:
+    """Yield the caller's shared client, or a short-lived one closed on exit."""
+    if client is not None:
+        yield client
+        return
+    async with httpx.AsyncClient(http2=True, timeout=timeout) as c:
+        yield c
+
+
+class _AsyncByteReader:
+    """Async file-like view over a streamed response body, as ijson expects."""
+
+    def __init__(self, resp: httpx.Response) -> None:
+        self._chunks = resp.aiter_bytes()
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            # ijson probes with read(0) to detect bytes vs str; don't consume a chunk
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+
+def _add_crtsh_names(names: Set[str], name_value: Optional[str], domain: str) -> None:
+    if not name_value:
+        return
+    names.update(fqdn for fqdn in map(str.lower, map(str.strip, name_value.splitlines())) if fqdn.endswith(domain))
+
+
+@cached("crtsh", decode=set)
+async def from_crtsh(domain: str, client: Optional[httpx.AsyncClient] = None) -> Set[str]:
     # Public, no key required
     url = f"https://crt.sh/?q=%25.{domain}&output=json"
+    names: Set[str] = set()
     try:
-        close = False
-        if client is None:
-            client = httpx.AsyncClient(timeout=10.0)
-            close = True
-        r = await client.get(url)
-        if r.status_code != 200:
-            return []
-        # Some entries may be concatenated JSON objects; handle leniency
-        try:
-            data = r.json()
-        except json.JSONDecodeError:
-            # Fallback: parse line-by-line
-            data = json.loads("[" + r.text.replace("}\n{", "},{") + "]")
-        names: Set[str] = set()
-        for item in data:
-            name_value = item.get("name_value") or ""
-            for raw in name_value.split("\n"):
-                fqdn = raw.strip().lower()
-                if fqdn.endswith(domain):
-                    names.add(fqdn)
-        return sorted(names)
+        async with _ensure_client(client) as client:
+            if ijson is not None:
+                # Stream the (often multi-MB) response and keep only name_value strings
+                async with client.stream("GET", url) as r:
+                    if r.status_code != 200:
+                        return set()
+                    # multiple_values tolerates concatenated top-level objects
+                    async for prefix, event, value in ijson.parse_async(_AsyncByteReader(r), multiple_values=True):
+                        if event == "string" and prefix in ("item.name_value", "name_value"):
+                            _add_crtsh_names(names, value, domain)
+                return names
+            r = await client.get(url)
+            if r.status_code != 200:
+                return set()
+            # Some entries may be concatenated JSON objects; handle leniency
+            try:
+                data = orjson.loads(r.content)
+            except orjson.JSONDecodeError:
+                # Fallback: parse line-by-line
+                data = orjson.loads(b"[" + r.content.replace(b"}\n{", b"},{") + b"]")
+            for item in data:
+                _add_crtsh_names(names, item.get("name_value"), domain)
+            return names
     except Exception:
-        return []
-    finally:
-        if 'close' in locals() and close:
-            await client.aclose()
+        return set()
 
 
-async def from_threatcrowd(domain: str, client: Optional[httpx.AsyncClient] = None) -> List[str]:
+@cached("threatcrowd", decode=set)
+async def from_threatcrowd(domain: str, client: Optional[httpx.AsyncClient] = None) -> Set[str]:
     url = f"https://www.threatcrowd.org/searchApi/v2/domain/report/?domain={domain}"
     try:
-        close = False
-        if client is None:
-            client = httpx.AsyncClient(timeout=10.0)
-            close = True
-        r = await client.get(url)
-        if r.status_code != 200:
-            return []
-        data = r.json()
-        subs = data.get("subdomains") or []
-        out = [s.strip().lower() for s in subs if isinstance(s, str) and s.endswith(domain)]
-        return sorted(set(out))
+        async with _ensure_client(client) as client:
+            r = await client.get(url)
+            if r.status_code != 200:
+                return set()
+            data = orjson.loads(r.content)
+            subs = data.get("subdomains") or []
+            return {s.strip().lower() for s in subs if isinstance(s, str) and s.endswith(domain)}
     except Exception:
-        return []
-    finally:
-        if 'close' in locals() and close:
-            await client.aclose()
+        return set()
 
 
-async def from_threatcrowd_ip(ip: str, client: Optional[httpx.AsyncClient] = None) -> List[str]:
+@cached("threatcrowd_ip", decode=set)
+async def from_threatcrowd_ip(ip: str, client: Optional[httpx.AsyncClient] = None) -> Set[str]:
     """Resolve IP to domains observed by ThreatCrowd."""
     url = f"https://www.threatcrowd.org/searchApi/v2/ip/report/?ip={ip}"
     try:
-        close = False
-        if client is None:
-            client = httpx.AsyncClient(timeout=10.0)
-            close = True
-        r = await client.get(url)
-        if r.status_code != 200:
-            return []
-        data = r.json()
-        doms = data.get("resolutions") or []
-        out: List[str] = []
-        for item in doms:
-            d = item.get("domain") if isinstance(item, dict) else None
-            if isinstance(d, str) and d:
-                out.append(d.strip().lower())
-        return sorted(set(out))
+        async with _ensure_client(client) as client:
+            r = await client.get(url)
+            if r.status_code != 200:
+                return set()
+            data = orjson.loads(r.content)
+            doms = data.get("resolutions") or []
+            out: Set[str] = set()
+            for item in doms:
+                d = item.get("domain") if isinstance(item, dict) else None
+                if isinstance(d, str) and d:
+                    out.add(d.strip().lower())
+            return out
     except Exception:
-        return []
-    finally:
-        if 'close' in locals() and close:
-            await client.aclose()
+        return set()
 
 
-async def from_shodan(domain: str) -> Tuple[List[str], List[Tuple[str, int, List[str]]]]:
+async def from_shodan(domain: str, client: Optional[httpx.AsyncClient] = None) -> Tuple[List[str], List[Tuple[str, int, List[str]]]]:
     """Return (hostnames, observed_ports). observed_ports: list of (hostname, port, tech-hints)
     Uses Shodan API: search for domain and parse hostnames and open ports from datasets.
     """
@@ -102,11 +130,11 @@ async def from_shodan(domain: str) -> Tuple[List[str], List[Tuple[str, int, List
     hostnames: Set[str] = set()
     ports: List[Tuple[str, int, List[str]]] = []
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with _ensure_client(client, timeout=15.0) as client:
             r = await client.get(url)
             if r.status_code != 200:
                 return [], []
-            data = r.json()
+            data = orjson.loads(r.content)
             for m in data.get("matches", []):
                 # hostnames
                 for h in m.get("hostnames", []) or []:
@@ -143,6 +171,7 @@ async def from_shodan(domain: str) -> Tuple[List[str], List[Tuple[str, int, List
 
 # --- SecurityTrails ---
 
+@cached("st_subdomains")
 async def st_subdomains(domain: str, client: Optional[httpx.AsyncClient] = None) -> List[str]:
     """Enumerate subdomains via SecurityTrails (requires SECURITYTRAILS_API_KEY).
     API: POST https://api.securitytrails.com/v1/domain/{domain}/subdomains
@@ -153,25 +182,20 @@ async def st_subdomains(domain: str, client: Optional[httpx.AsyncClient] = None)
         return []
     base = f"https://api.securitytrails.com/v1/domain/{domain}/subdomains"
     headers = {"Accept": "application/json", "APIKEY": key}
-    close = False
     try:
-        if client is None:
-            client = httpx.AsyncClient(timeout=15.0)
-            close = True
-        r = await client.get(base, headers=headers)
-        if r.status_code != 200:
-            return []
-        data = r.json()
-        subs = data.get("subdomains") or []
-        out = [f"{s.strip().lower()}.{domain}" for s in subs if isinstance(s, str) and s.strip()]
-        return sorted(set(out))
+        async with _ensure_client(client, timeout=15.0) as client:
+            r = await client.get(base, headers=headers)
+            if r.status_code != 200:
+                return []
+            data = orjson.loads(r.content)
+            subs = data.get("subdomains") or []
+            out = [f"{s.strip().lower()}.{domain}" for s in subs if isinstance(s, str) and s.strip()]
+            return sorted(set(out))
     except Exception:
         return []
-    finally:
-        if close:
-            await client.aclose()
 
 
+@cached("st_dns_history")
 async def st_dns_history(domain: str, client: Optional[httpx.AsyncClient] = None) -> Dict[str, List[str]]:
     """Fetch current DNS A/AAAA and historical to cross-reference IPs for the domain via SecurityTrails.
     API: GET https://api.securitytrails.com/v1/domain/{domain}
@@ -183,32 +207,26 @@ async def st_dns_history(domain: str, client: Optional[httpx.AsyncClient] = None
         return {}
     url = f"https://api.securitytrails.com/v1/domain/{domain}"
     headers = {"Accept": "application/json", "APIKEY": key}
-    close = False
     try:
-        if client is None:
-            client = httpx.AsyncClient(timeout=15.0)
-            close = True
-        r = await client.get(url, headers=headers)
-        if r.status_code != 200:
-            return {}
-        data = r.json()
-        recs: Dict[str, List[str]] = {}
-        for t in ("a", "aaaa", "mx", "ns", "cname"):
-            vals: List[str] = []
-            cur = (((data.get("current_dns") or {}).get(t) or {}).get("values") or [])
-            for v in cur:
-                if isinstance(v, dict):
-                    # A/AAAA
-                    if "ip" in v:
-                        vals.append(str(v.get("ip")).strip())
-                    # CNAME/MX/NS
-                    if "hostname" in v:
-                        vals.append(str(v.get("hostname")).strip().lower())
-            if vals:
-                recs[t] = sorted(set(vals))
-        return recs
+        async with _ensure_client(client, timeout=15.0) as client:
+            r = await client.get(url, headers=headers)
+            if r.status_code != 200:
+                return {}
+            data = orjson.loads(r.content)
+            recs: Dict[str, List[str]] = {}
+            for t in ("a", "aaaa", "mx", "ns", "cname"):
+                vals: List[str] = []
+                cur = (((data.get("current_dns") or {}).get(t) or {}).get("values") or [])
+                for v in cur:
+                    if isinstance(v, dict):
+                        # A/AAAA
+                        if "ip" in v:
+                            vals.append(str(v.get("ip")).strip())
+                        # CNAME/MX/NS
+                        if "hostname" in v:
+                            vals.append(str(v.get("hostname")).strip().lower())
+                if vals:
+                    recs[t] = sorted(set(vals))
+            return recs
     except Exception:
         return {}
-    finally:
-        if close:
-            await client.aclose()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def _progress_ticker(done: asyncio.Event, interval: float, report: Callable[[], None]) -> None:
+    """Call report() every interval seconds until done is set.
+    asyncio.wait returns on timeout instead of raising, so no exception is built per tick.
+    """
+    waiter = asyncio.ensure_future(done.wait())
+    try:
+        while True:
+            finished, _ = await asyncio.wait({waiter}, timeout=interval)
+            if finished:
+                return
+            # Periodic report
+            report()
+    finally:
+        waiter.cancel()
+
+
+async def run_pool(
+    items: Sequence[T],
+    fn: Callable[[T], Awaitable[R]],
+    concurrency: int,
+    *,
+    default: Any = None,
+    gate: Optional[asyncio.Semaphore] = None,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    progress_interval: float = 30.0,
+) -> List[R]:
+    """Apply ``fn`` to every item with a fixed pool of ``concurrency`` workers.
+    Workers pull from one shared lazy iterator, so a ``range`` is never materialized.
+    Results follow input order; an item whose call raised gets ``default``.
+    ``gate`` is an optional budget shared with other pools; ``progress_cb(done, total)``
+    fires every ``progress_interval`` seconds and once at the end.
+    """
+    total = len(items)
+    results: List[R] = [default] * total
+    pending = iter(enumerate(items))
+    slot = gate if gate is not None else contextlib.nullcontext()
+    finished = 0
+    done = asyncio.Event()
+
+    async def worker() -> None:
+        nonlocal finished
+        # next() never awaits, so on the single-threaded loop each item goes to exactly one worker
+        for i, item in pending:
+            async with slot:
+                try:
+                    results[i] = await fn(item)
+                except Exception:
+                    pass
+            finished += 1
+
+    ticker = None
+    if progress_cb and total:
+        ticker = asyncio.create_task(_progress_ticker(done, progress_interval, lambda: progress_cb(finished, total)))
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    finally:
+        done.set()
+        if ticker is not None:
+            with contextlib.suppress(Exception):
+                await ticker
+    if progress_cb and total:
+        progress_cb(finished, total)
+    return results
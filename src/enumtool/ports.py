@@ -1,20 +1,34 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Iterable, List, Tuple, Optional, Callable
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 import socket
-import asyncio
 import contextlib
+import ipaddress
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+
+import orjson
+
+from .pool import run_pool
 try:
     import socks  # PySocks
 except Exception:  # pragma: no cover
     socks = None  # type: ignore
 
 
-DEFAULT_PORTS = [
+DEFAULT_PORTS = (
     21, 22, 25, 53, 80, 110, 123, 143, 161, 389,
     443, 445, 465, 587, 631, 636, 8000, 8080, 8443, 9000,34400,
-]
+)
+
+# Full port range; a range is iterated lazily instead of materializing 65535 ints
+ALL_PORTS = range(1, 65536)
+
+# UDP probes sent per port, spaced evenly across the timeout
+UDP_PROBE_TRIES = 3
 
 
 async def check_port(host: str, port: int, timeout: float = 3.0, socks_proxy: Optional[Tuple[str, int]] = None) -> bool:
@@ -31,130 +45,200 @@ async def check_port(host: str, port: int, timeout: float = 3.0, socks_proxy: Op
             except Exception:
                 return False
         return await asyncio.to_thread(_block)
-    # Fallback: plain asyncio TCP
+    # Fallback: raw non-blocking connect. No Transport/Protocol objects are built;
+    # we only need to know whether the handshake completes.
+    loop = asyncio.get_running_loop()
+    sock = None
     try:
-        conn = asyncio.open_connection(host, port)
-        reader, writer = await asyncio.wait_for(conn, timeout=timeout)
-        writer.close()
         try:
-            await writer.wait_closed()
-        except Exception:
-            pass
+            family = socket.AF_INET6 if ipaddress.ip_address(host).version == 6 else socket.AF_INET
+            addr: Tuple = (host, port)
+        except ValueError:
+            infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            family, _, _, _, addr = infos[0]
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        await asyncio.wait_for(loop.sock_connect(sock, addr), timeout=timeout)
         return True
     except Exception:
         return False
+    finally:
+        if sock is not None:
+            sock.close()
 
 
-async def scan_ports(host: str, ports: Iterable[int], concurrency: int = 200, timeout: float = 3.0, socks_proxy: Optional[Tuple[str, int]] = None, progress_cb: Optional[Callable[[int, int], None]] = None, progress_interval: float = 30.0) -> List[Tuple[int, bool]]:
-    sem = asyncio.Semaphore(concurrency)
-    port_list = list(ports)
-    total = len(port_list)
-    scanned = 0
-    lock = asyncio.Lock()
-    done = asyncio.Event()
-    results: List[Tuple[int, bool]] = []
-
-    async def ticker():
-        if not progress_cb or total == 0:
-            return
-        while True:
-            try:
-                await asyncio.wait_for(done.wait(), timeout=progress_interval)
-                return
-            except asyncio.TimeoutError:
-                # Periodic report
-                progress_cb(scanned, total)
-
-    async def worker(p: int):
-        nonlocal scanned
-        async with sem:
-            open_ = await check_port(host, p, timeout=timeout, socks_proxy=socks_proxy)
-            results.append((p, open_))
-            async with lock:
-                scanned += 1
-
-    t_task = asyncio.create_task(ticker())
-    try:
-        await asyncio.gather(*(worker(p) for p in port_list))
-    finally:
-        done.set()
-        with contextlib.suppress(Exception):
-            await t_task
-    # Final report
-    if progress_cb and total:
-        progress_cb(scanned, total)
-    return sorted(results)
-
-
-async def check_udp_port(host: str, port: int, timeout: float = 1.0) -> bool:
-    """Best-effort UDP check: send a small payload and consider 'open' only if any response arrives.
-    Limitations: many UDP services don't reply to random payloads, so open ports may be missed.
+async def _resolve_host(host: str) -> str:
+    """Resolve host to an address literal once, so per-port probes skip getaddrinfo.
+    Literals come back in canonical form, matching the source addresses the UDP demux sees.
     """
-    loop = asyncio.get_running_loop()
-    fut: asyncio.Future[bool] = loop.create_future()
+    try:
+        return str(ipaddress.ip_address(host))
+    except ValueError:
+        pass
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        return infos[0][4][0]
+    except Exception:
+        # Leave it to the per-port probe to fail
+        return host
+
+
+async def scan_ports(host: str, ports: Iterable[int], concurrency: int = 200, timeout: float = 3.0, socks_proxy: Optional[Tuple[str, int]] = None, progress_cb: Optional[Callable[[int, int], None]] = None, progress_interval: float = 30.0, gate: Optional[asyncio.Semaphore] = None) -> List[Tuple[int, bool]]:
+    if socks_proxy is None:
+        # Over Tor the proxy resolves the name; resolving here would leak DNS
+        host = await _resolve_host(host)
+    port_list = ports if isinstance(ports, Sequence) else list(ports)
+
+    async def probe(p: int) -> bool:
+        return await check_port(host, p, timeout=timeout, socks_proxy=socks_proxy)
+
+    opens = await run_pool(port_list, probe, concurrency, default=False, gate=gate, progress_cb=progress_cb, progress_interval=progress_interval)
+    return list(zip(port_list, opens))
 
-    class Proto(asyncio.DatagramProtocol):
-        def connection_made(self, transport):
-            try:
-                transport.sendto(b"\x00")
-            except Exception:
-                pass
 
-        def datagram_received(self, data, addr):
-            if not fut.done():
-                fut.set_result(True)
+class _UDPDemux(asyncio.DatagramProtocol):
+    """One socket for a whole UDP sweep; replies are routed to waiters by source port."""
 
-        def error_received(self, exc):
-            if not fut.done():
-                fut.set_result(False)
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self.waiters: Dict[int, asyncio.Future[bool]] = {}
 
+    def datagram_received(self, data, addr):
+        if addr[0] != self.host:
+            return
+        fut = self.waiters.get(addr[1])
+        if fut is not None and not fut.done():
+            fut.set_result(True)
+
+    def error_received(self, exc):
+        # ICMP errors on an unconnected socket can't be attributed to a port; let probes time out
+        pass
+
+
+async def scan_udp_ports(host: str, ports: Iterable[int], concurrency: int = 200, timeout: float = 1.0, progress_cb: Optional[Callable[[int, int], None]] = None, progress_interval: float = 30.0, gate: Optional[asyncio.Semaphore] = None) -> List[Tuple[int, bool]]:
+    host = await _resolve_host(host)
+    port_list = ports if isinstance(ports, Sequence) else list(ports)
+    loop = asyncio.get_running_loop()
+    try:
+        family = socket.AF_INET6 if ipaddress.ip_address(host).version == 6 else socket.AF_INET
+    except ValueError:
+        family = socket.AF_INET
+    demux = _UDPDemux(host)
     try:
-        transport, protocol = await loop.create_datagram_endpoint(lambda: Proto(), remote_addr=(host, port))
+        transport, _ = await loop.create_datagram_endpoint(lambda: demux, family=family)
+    except Exception:
+        return [(p, False) for p in port_list]
+
+    def send(p: int) -> None:
+        with contextlib.suppress(OSError):
+            transport.sendto(b"\x00", (host, p))
+
+    async def probe(p: int) -> bool:
+        fut: asyncio.Future[bool] = loop.create_future()
+        demux.waiters[p] = fut
+        # UDP is lossy: resend a few times within the timeout, stop on the first reply
+        send(p)
+        resends = [loop.call_later(timeout / UDP_PROBE_TRIES * k, send, p) for k in range(1, UDP_PROBE_TRIES)]
         try:
-            try:
-                return await asyncio.wait_for(fut, timeout=timeout)
-            except asyncio.TimeoutError:
-                return False
+            return await asyncio.wait_for(fut, timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
         finally:
-            transport.close()
-    except Exception:
-        return False
+            for h in resends:
+                h.cancel()
+            demux.waiters.pop(p, None)
 
+    try:
+        opens = await run_pool(port_list, probe, concurrency, default=False, gate=gate, progress_cb=progress_cb, progress_interval=progress_interval)
+    finally:
+        transport.close()
+    return list(zip(port_list, opens))
+
+
+# --- External scanner backends (TCP only) ---
+
+SCAN_BACKENDS = ("asyncio", "nmap", "masscan")
+MASSCAN_RATE = 1000  # packets/second
+
+
+def _port_spec(ports: Sequence[int]) -> str:
+    """Compact nmap/masscan port expression: 1-1024,8080,8443."""
+    parts: List[str] = []
+    ordered = sorted(set(ports))
+    i = 0
+    while i < len(ordered):
+        j = i
+        while j + 1 < len(ordered) and ordered[j + 1] == ordered[j] + 1:
+            j += 1
+        parts.append(str(ordered[i]) if i == j else f"{ordered[i]}-{ordered[j]}")
+        i = j + 1
+    return ",".join(parts)
+
+
+def _parse_nmap_xml(data: bytes) -> Dict[str, List[int]]:
+    found: Dict[str, List[int]] = {}
+    for host in ET.fromstring(data).iter("host"):
+        addr = host.find("address")
+        if addr is None:
+            continue
+        found[addr.get("addr", "")] = sorted(
+            int(p.get("portid", 0))
+            for p in host.iter("port")
+            if p.get("protocol") == "tcp" and (p.find("state") is not None and p.find("state").get("state") == "open")
+        )
+    return found
+
+
+def _parse_masscan_json(data: bytes) -> Dict[str, List[int]]:
+    found: Dict[str, set] = {}
+    # -oJ emits one record per line inside a JSON array, with trailing commas: parse per line
+    for line in data.splitlines():
+        line = line.strip().rstrip(b",")
+        if not line.startswith(b"{"):
+            continue
+        try:
+            rec = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+        for p in rec.get("ports") or []:
+            if p.get("proto") == "tcp" and p.get("status") == "open":
+                found.setdefault(rec.get("ip", ""), set()).add(int(p["port"]))
+    return {ip: sorted(ps) for ip, ps in found.items()}
+
+
+async def external_tcp_scan(backend: str, addrs: Sequence[str], ports: Sequence[int]) -> Optional[Dict[str, List[int]]]:
+    """Scan every address in one nmap/masscan run. Returns addr -> open TCP ports, or None if the
+    backend is unavailable or failed (callers fall back to scan_ports). IPv4 literals only.
+    """
+    exe = shutil.which(backend)
+    targets = [a for a in addrs if _is_ipv4(a)]
+    if exe is None or not targets or not ports:
+        return None
+    spec = _port_spec(ports)
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("\n".join(targets))
+        target_file = f.name
+    try:
+        if backend == "nmap":
+            # -Pn/-n: targets are already resolved and known to exist; nmap picks SYN or connect by privilege
+            cmd = [exe, "-Pn", "-n", "--open", "-p", spec, "-iL", target_file, "-oX", "-"]
+        else:
+            cmd = [exe, f"-p{spec}", f"--rate={MASSCAN_RATE}", "-iL", target_file, "-oJ", "-"]
+        proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+        out, _ = await proc.communicate()
+        if proc.returncode != 0:
+            return None
+        found = _parse_nmap_xml(out) if backend == "nmap" else _parse_masscan_json(out)
+    except Exception:
+        return None
+    finally:
+        with contextlib.suppress(OSError):
+            os.unlink(target_file)
+    return {a: found.get(a, []) for a in targets}
 
-async def scan_udp_ports(host: str, ports: Iterable[int], concurrency: int = 200, timeout: float = 1.0, progress_cb: Optional[Callable[[int, int], None]] = None, progress_interval: float = 30.0) -> List[Tuple[int, bool]]:
-    sem = asyncio.Semaphore(concurrency)
-    port_list = list(ports)
-    total = len(port_list)
-    scanned = 0
-    lock = asyncio.Lock()
-    done = asyncio.Event()
-    results: List[Tuple[int, bool]] = []
 
-    async def ticker():
-        if not progress_cb or total == 0:
-            return
-        while True:
-            try:
-                await asyncio.wait_for(done.wait(), timeout=progress_interval)
-                return
-            except asyncio.TimeoutError:
-                progress_cb(scanned, total)
-
-    async def worker(p: int):
-        nonlocal scanned
-        async with sem:
-            open_ = await check_udp_port(host, p, timeout=timeout)
-            results.append((p, open_))
-            async with lock:
-                scanned += 1
-
-    t_task = asyncio.create_task(ticker())
+def _is_ipv4(addr: str) -> bool:
     try:
-        await asyncio.gather(*(worker(p) for p in port_list))
-    finally:
-        done.set()
-        with contextlib.suppress(Exception):
-            await t_task
-    if progress_cb and total:
-        progress_cb(scanned, total)
-    return sorted(results)
+        return ipaddress.ip_address(addr).version == 4
+    except ValueError:
+        return False
@@ -1,26 +1,52 @@
 from __future__ import annotations
 
+import atexit
+import contextlib
+import functools
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 import importlib.resources as pkg_resources
 
 
-def render_report(template_dir: Path | None, context: Dict[str, Any]) -> str:
-    if template_dir and (template_dir / "report.html.j2").exists():
-        loader = FileSystemLoader(str(template_dir))
+_resource_stack = contextlib.ExitStack()
+atexit.register(_resource_stack.close)
+
+
+@functools.lru_cache(maxsize=None)
+def _packaged_dir() -> str:
+    """Filesystem path of the packaged templates, resolved once per process.
+    For zipped installs as_file() extracts to a temp dir; keep it until exit.
+    """
+    p = _resource_stack.enter_context(pkg_resources.as_file(pkg_resources.files("enumtool.resources")))
+    return str(p)
+
+
+@functools.lru_cache(maxsize=8)
+def _build_env(template_dir: Optional[str]) -> Environment:
+    """Build (once per template dir) the Environment; it keeps compiled templates cached."""
+    if template_dir is not None:
+        loader = FileSystemLoader(template_dir)
     else:
         # Fallback to packaged resource
-        with pkg_resources.as_file(pkg_resources.files("enumtool.resources")) as p:
-            loader = FileSystemLoader(str(p))
-    env = Environment(
+        loader = FileSystemLoader(_packaged_dir())
+    return Environment(
         loader=loader,
         autoescape=select_autoescape(["html", "xml"]),
         trim_blocks=True,
         lstrip_blocks=True,
+        auto_reload=False,
+        cache_size=400,
     )
+
+
+def render_report(template_dir: Path | None, context: Dict[str, Any]) -> str:
+    if template_dir and (template_dir / "report.html.j2").exists():
+        env = _build_env(str(template_dir))
+    else:
+        env = _build_env(None)
     tmpl = env.get_template("report.html.j2")
     return tmpl.render(**context)
 
@@ -1,61 +1,193 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from dataclasses import asdict
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Iterable, List, Optional, TYPE_CHECKING
-if TYPE_CHECKING:
-    import httpx
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-from .dns_utils import enumerate_dns, enumerate_dns_doh, ptr_lookup
+import httpx
+import orjson
+
+from .cache import configure as configure_cache, json_default
+from .dns_utils import begin_dns_memo, enumerate_dns, enumerate_dns_doh, enumerate_dns_many, ptr_lookup
 from .models import DNSRecords, HTTPInfo, PortInfo, ScanResult, SubdomainFinding, WhoisInfo
 from .report import render_report, write_report
 from .subdomains import brute_subdomains, passive_hints
+from .tech_infer import merge_tech_hints
 from .whois_utils import fetch_whois
 from .config import get_settings
 from .shodan_utils import ShodanClient
-from .passive_sources import from_crtsh, from_threatcrowd, st_subdomains, st_dns_history
-from .ports import DEFAULT_PORTS  # presets used only when active scan is enabled
+from .passive_sources import from_crtsh, from_threatcrowd, from_threatcrowd_ip, st_subdomains, st_dns_history
+from .ports import ALL_PORTS, DEFAULT_PORTS  # presets used only when active scan is enabled
 from .tor_utils import TorManager
 
 
-def _choose_ports(preset: Optional[str], explicit: Optional[str]) -> List[int]:
+# Open ports worth an HTTP(S) fingerprint
+HTTP_PORTS = frozenset({80, 8080, 8000, 8888})
+HTTPS_PORTS = frozenset({443, 8443})
+
+# Preset port lists are constant: build them once at import
+_PRESET_PORTS: Dict[str, Tuple[int, ...]] = {
+    "web": (80, 443, 8080, 8443),
+    # Minimal representative set; user can expand later
+    "top100": tuple(sorted(set(DEFAULT_PORTS) | {23, 135, 139, 3306, 3389, 53, 25})),
+    "full-small": DEFAULT_PORTS,  # already sorted and unique
+}
+
+
+@lru_cache(maxsize=32)
+def _parse_ports(explicit: str) -> Tuple[int, ...]:
+    return tuple(sorted({int(p.strip()) for p in explicit.split(",") if p.strip().isdigit()}))
+
+
+def _choose_ports(preset: Optional[str], explicit: Optional[str]) -> Tuple[int, ...]:
     if explicit:
-        return sorted({int(p.strip()) for p in explicit.split(",") if p.strip().isdigit()})
-    if preset == "web":
-        return [80, 443, 8080, 8443]
-    if preset == "top100":
-        # Minimal representative set; user can expand later
-        base = set(DEFAULT_PORTS)
-        base.update([23, 135, 139, 3306, 3389, 53, 25])
-        return sorted(base)
-    if preset == "full-small":
-        return sorted(set(DEFAULT_PORTS))
-    return sorted(set(DEFAULT_PORTS))
-
-
-async def _resolve_all(names: Iterable[str], *, anon: bool = False, client: Optional["httpx.AsyncClient"] = None) -> List[SubdomainFinding]:
-    results: List[SubdomainFinding] = []
-    for name in names:
+        return _parse_ports(explicit)
+    return _PRESET_PORTS.get(preset or "", _PRESET_PORTS["full-small"])
+
+
+def _shared_client(socks_url: Optional[str], concurrency: int) -> httpx.AsyncClient:
+    """One pooled HTTP/2 client per scan (optionally over Tor), shared by the passive
+    sources, DoH and every HTTP fingerprint so connections and TLS sessions are reused.
+    """
+    proxies = {"http://": socks_url, "https://": socks_url} if socks_url else None
+    # Sized to the scan's concurrency gate: every subdomain is its own origin (no h2 sharing),
+    # and a smaller pool would make gated requests time out waiting for a connection
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=15.0,
+        proxies=proxies,
+        follow_redirects=True,
+        headers={"User-Agent": "EnumTool/1.0"},
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=min(concurrency, 100)),
+    )
+
+
+# Hosts with more ports than this hold large result lists...
+LARGE_PORT_LIST = 4096
+# ...so at most this many of them are scanned at once
+ACTIVE_PARALLEL_SUBS = 8
+
+
+def _subdomain_gate(port_count: int) -> "asyncio.Semaphore | contextlib.nullcontext":
+    # Full-range scans hold tens of thousands of results per host: cap how many run together
+    return asyncio.Semaphore(ACTIVE_PARALLEL_SUBS) if port_count > LARGE_PORT_LIST else contextlib.nullcontext()
+
+
+async def _scan_address(
+    addr: str,
+    label: str,
+    tcp_ports: Sequence[int],
+    udp_ports: Sequence[int],
+    *,
+    anon: bool,
+    concurrency: int,
+    timeout: float,
+    socks_tuple: Optional[Tuple[str, int]],
+    gate: asyncio.Semaphore,
+    progress: Optional[Callable[[str], None]] = None,
+    tcp_open: Optional[List[int]] = None,
+) -> Tuple[List[Tuple[int, bool]], List[Tuple[int, bool]]]:
+    """TCP then UDP scan of one address; returns (tcp_states, udp_states).
+    ``tcp_open`` carries an external backend's result for this address and skips the TCP pass.
+    """
+    from .ports import scan_ports, scan_udp_ports  # lazy import to avoid accidental usage otherwise
+    tcp_states: List[Tuple[int, bool]] = []
+    if tcp_open is not None:
+        tcp_states = [(p, True) for p in tcp_open]
+    elif tcp_ports:
+        if progress:
+            progress(f"[dim]  → {label}: scanning {len(tcp_ports)} TCP ports…[/]")
+        def _tcp_prog(done: int, total: int) -> None:
+            if progress:
+                progress(f"[dim]     {label}: {done}/{total} TCP ports scanned…[/]")
+        tcp_states = await scan_ports(addr, tcp_ports, concurrency=concurrency, timeout=timeout, socks_proxy=socks_tuple, progress_cb=_tcp_prog, progress_interval=30.0, gate=gate)
+    # UDP cannot be proxied over Tor; skip in anon mode
+    udp_states: List[Tuple[int, bool]] = []
+    if udp_ports:
         if anon:
-            a, aaaa, cname, txt, mx, ns, srv = await enumerate_dns_doh(name, client)
+            if progress:
+                progress(f"[yellow]Skipping UDP scan for {label} in anon mode (cannot route via Tor).[/]")
         else:
-            a, aaaa, cname, txt, mx, ns, srv = await enumerate_dns(name)
+            if progress:
+                progress(f"[dim]  → {label}: scanning {len(udp_ports)} UDP ports…[/]")
+            def _udp_prog(done: int, total: int) -> None:
+                if progress:
+                    progress(f"[dim]     {label}: {done}/{total} UDP ports scanned…[/]")
+            udp_states = await scan_udp_ports(addr, udp_ports, concurrency=concurrency, timeout=max(1.0, timeout/2), progress_cb=_udp_prog, progress_interval=30.0, gate=gate)
+    return tcp_states, udp_states
+
+
+async def _external_tcp(backend: str, addrs: Iterable[str], tcp_ports: Sequence[int], anon: bool, progress: Optional[Callable[[str], None]]) -> Dict[str, List[int]]:
+    """Open TCP ports per address from one nmap/masscan run; empty when the asyncio scanner should be used."""
+    if backend == "asyncio" or not tcp_ports:
+        return {}
+    if anon:
+        if progress:
+            progress(f"[yellow]--backend {backend} cannot run over Tor; using the built-in scanner.[/]")
+        return {}
+    from .ports import external_tcp_scan
+    addr_list = list(dict.fromkeys(addrs))
+    if progress:
+        progress(f"Running {backend} across {len(addr_list)} address(es)…")
+    found = await external_tcp_scan(backend, addr_list, tcp_ports)
+    if found is None:
+        if progress:
+            progress(f"[yellow]{backend} unavailable or failed; using the built-in scanner.[/]")
+        return {}
+    return found
+
+
+def _socks_tuple(socks_url: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Parse socks5://host:port -> (host, port) for the raw-socket port scanner."""
+    if not socks_url:
+        return None
+    try:
+        host, port_s = socks_url.split("://", 1)[1].split(":")
+        return host, int(port_s)
+    except Exception:
+        return None
+
+
+async def _resolve_all(names: Iterable[str], *, anon: bool = False, client: Optional[httpx.AsyncClient] = None, concurrency: int = 100, progress: Optional[Callable[[str], None]] = None) -> List[SubdomainFinding]:
+    names = list(names)
+    resolved = await enumerate_dns_many(names, concurrency, anon=anon, client=client)
+    failed = len(set(names)) - len(resolved)
+    if failed and progress:
+        progress(f"[yellow]{failed} name(s) failed to resolve and were skipped.[/]")
+    results: List[SubdomainFinding] = []
+    for name, (a, aaaa, cname, txt, mx, ns, srv) in resolved.items():
         ips = a + aaaa
         rec = DNSRecords(a=a, aaaa=aaaa, cname=cname, txt=txt, mx=mx, ns=ns, srv=srv)
         results.append(SubdomainFinding(name=name, ips=ips, dns=rec))
     return results
 
 
-async def _enrich_with_shodan(f: SubdomainFinding, shodan: ShodanClient) -> None:
-    """Use Shodan host data to populate open ports and HTTP info without active probing."""
-    # For each resolved IP, pull Shodan host info
-    seen_ports = set()
+async def _shodan_host_map(ips: Iterable[str], shodan: ShodanClient, client: httpx.AsyncClient, gate: asyncio.Semaphore) -> Dict[str, Optional[dict]]:
+    """Fetch Shodan host info once per distinct IP; failed lookups map to None."""
+    unique = list(dict.fromkeys(ips))
+
+    async def fetch(ip: str) -> Optional[dict]:
+        async with gate:
+            return await shodan.host_info_async(ip, client)
+
+    hosts = await asyncio.gather(*(fetch(ip) for ip in unique), return_exceptions=True)
+    return {ip: _ok(host, None) for ip, host in zip(unique, hosts)}
+
+
+def _enrich_with_shodan(f: SubdomainFinding, host_map: Dict[str, Optional[dict]], seen_ports: Set[int]) -> None:
+    """Use Shodan host data to populate open ports and HTTP info without active probing.
+    ``seen_ports`` is the scan's set of the finding's open port numbers, grown as banners add new ones.
+    """
+    if not f.ips:
+        return
     for ip in f.ips:
-        host = shodan.host_info(ip)
-        if not host:
+        host = host_map.get(ip)
+        if not isinstance(host, dict):
             continue
         for item in host.get("data", []) or []:
             port = item.get("port")
@@ -66,39 +198,50 @@ async def _enrich_with_shodan(f: SubdomainFinding, shodan: ShodanClient) -> None
                 f.ports.append(PortInfo(port=port, open=True, service=item.get("product")))
             # HTTP specifics
             http = item.get("http")
-            if http:
-                ssl = bool(item.get("ssl")) or port in (443, 8443)
-                scheme = "https" if ssl else "http"
-                key = f"{port}/{scheme}"
-                if key not in f.http:
-                    f.http[key] = HTTPInfo(
-                        url=f"{scheme}://{f.name}:{port}",
-                        status=http.get("status") if isinstance(http.get("status"), int) else None,
-                        title=http.get("title"),
-                        server=http.get("server"),
-                        tech=[t for t in [http.get("server"), item.get("product")] if t],
-                    )
-
-
-async def run_scan(domain: str, outdir: Path, ports_preset: Optional[str], ports_list: Optional[str], wordlist: Path, bruteforce: bool, concurrency: int, timeout: float, active_scan: bool, progress: Optional[Callable[[str], None]] = None, anon: bool = False) -> ScanResult:
-    if progress:
-        progress("Fetching WHOIS and apex DNS records…")
-    # WHOIS and apex DNS
-    who = {} if anon else fetch_whois(domain)
-    if anon:
-        a, aaaa, cname, txt, mx, ns, srv = await enumerate_dns_doh(domain)
-    else:
-        a, aaaa, cname, txt, mx, ns, srv = await enumerate_dns(domain)
-    apex_records = DNSRecords(a=a, aaaa=aaaa, cname=cname, txt=txt, mx=mx, ns=ns, srv=srv)
-    whois_info = WhoisInfo(
-        registrar=who.get("registrar"),
-        creation_date=str(who.get("creation_date")),
-        expiration_date=str(who.get("expiration_date")),
-        name_servers=[str(who.get("name_servers"))] if who.get("name_servers") else [],
-    )
+            if not http:
+                continue
+            ssl = bool(item.get("ssl")) or port in HTTPS_PORTS
+            scheme = "https" if ssl else "http"
+            key = f"{port}/{scheme}"
+            if key in f.http:
+                continue
+            status = http.get("status")
+            f.http[key] = HTTPInfo(
+                url=f"{scheme}://{f.name}:{port}",
+                status=status if isinstance(status, int) else None,
+                title=http.get("title"),
+                server=http.get("server"),
+                tech=merge_tech_hints((http.get("server"), item.get("product"))),
+            )
 
+
+def _ok(value, default):
+    """Result of a gather(return_exceptions=True) slot, or default if it raised."""
+    return default if isinstance(value, BaseException) else value
+
+
+def _merge_port_states(sf: SubdomainFinding, open_ports: Set[int], tcp_states: Iterable[Tuple[int, bool]], udp_states: Iterable[Tuple[int, bool]]) -> None:
+    """Append newly open ports from an active scan, preserving OSINT-found ones.
+    The OSINT port set is snapshotted once; the scanners never report a port twice per protocol,
+    so it doesn't need to grow while merging (and TCP/UDP hits on one number stay distinct).
+    """
+    known = frozenset(open_ports)
+    for proto, states in (("tcp", tcp_states), ("udp", udp_states)):
+        for p, state in states:
+            if state and p not in known:
+                sf.ports.append(PortInfo(port=p, open=True, protocol=proto))
+                open_ports.add(p)
+
+
+def _web_targets(open_ports: Set[int]) -> List[Tuple[int, bool]]:
+    """(port, ssl) pairs worth fingerprinting among a finding's open ports."""
+    return [(p, False) for p in sorted(open_ports & HTTP_PORTS)] + [(p, True) for p in sorted(open_ports & HTTPS_PORTS)]
+
+
+async def run_scan(domain: str, outdir: Path, ports_preset: Optional[str], ports_list: Optional[str], wordlist: Path, bruteforce: bool, concurrency: int, timeout: float, active_scan: bool, progress: Optional[Callable[[str], None]] = None, anon: bool = False, backend: str = "asyncio") -> ScanResult:
     # OSINT clients
     settings = get_settings()
+    begin_dns_memo()
     tor: Optional[TorManager] = None
     socks_url = None
     if anon:
@@ -111,180 +254,181 @@ async def run_scan(domain: str, outdir: Path, ports_preset: Optional[str], ports
             if progress:
                 progress(f"[warning] Could not start Tor: {e}")
             raise RuntimeError("--anon requested but Tor is not available/running. Install Tor or set TOR_EXE.")
+    socks_tuple = _socks_tuple(socks_url)
     shodan = ShodanClient(settings.shodan_api_key, proxies={"http": socks_url, "https": socks_url} if socks_url else None)
-
-    # Subdomains via DNS hints, crt.sh, ThreatCrowd, and Shodan
-    if progress:
-        progress("Gathering passive subdomain hints (DNS TXT/MX/NS/CNAME)…")
-    # Shared HTTP client (optionally over Tor)
-    http_client = None
-    if socks_url:
-        import httpx  # type: ignore[import]
-        proxies = {"http://": socks_url, "https://": socks_url}
-        http_client = httpx.AsyncClient(timeout=10.0, proxies=proxies)
-    # Passive OSINT collection
-    hints = await passive_hints(domain, anon=anon, client=http_client)  # DNS hints respect anon mode
-    if progress:
-        progress("Querying crt.sh and ThreatCrowd for CT and community data…")
-    crt = await from_crtsh(domain, client=http_client) if http_client else await from_crtsh(domain)
-    tc = await from_threatcrowd(domain, client=http_client) if http_client else await from_threatcrowd(domain)
-    # SecurityTrails: subdomains and apex DNS cross-ref
-    st_subs: List[str] = []
+    http_client = _shared_client(socks_url, concurrency)
     try:
+        # One concurrency budget for every network-initiating stage (Shodan, ports, HTTP)
+        gate = asyncio.Semaphore(concurrency)
+
+        # WHOIS, apex DNS and every passive source are independent: run them all at once
         if progress:
-            progress("Querying SecurityTrails for subdomains and DNS…")
-        st_subs = await st_subdomains(domain, client=http_client) if http_client else await st_subdomains(domain)
-        st_dns = await st_dns_history(domain, client=http_client) if http_client else await st_dns_history(domain)
+            progress("Fetching WHOIS, apex DNS and passive sources (DNS hints, crt.sh, ThreatCrowd, SecurityTrails, Shodan)…")
+
+        async def _no_whois() -> dict:
+            return {}
+
+        async def _shodan_domain() -> tuple:
+            if not shodan.enabled():
+                return [], {}
+            try:
+                return await shodan.domain_info_async(domain, http_client)
+            except Exception:
+                return [], {}
+
+        (
+            who,
+            apex,
+            hints,  # DNS hints respect anon mode
+            crt,
+            tc,
+            st_subs,
+            st_dns,
+            shodan_res,
+        ) = await asyncio.gather(
+            _no_whois() if anon else asyncio.to_thread(fetch_whois, domain),
+            enumerate_dns_doh(domain, http_client) if anon else enumerate_dns(domain),
+            passive_hints(domain, anon=anon, client=http_client),
+            from_crtsh(domain, client=http_client),
+            from_threatcrowd(domain, client=http_client),
+            st_subdomains(domain, client=http_client),
+            st_dns_history(domain, client=http_client),
+            _shodan_domain(),
+            return_exceptions=True,
+        )
+        # A failing provider must not sink the others: treat it as having found nothing
+        who = _ok(who, {})
+        a, aaaa, cname, txt, mx, ns, srv = _ok(apex, ([],) * 7)
+        hints = _ok(hints, [])
+        crt = _ok(crt, set())
+        tc = _ok(tc, set())
+        st_subs = _ok(st_subs, [])
+        st_dns = _ok(st_dns, {})
+        shodan_subs, shodan_records = _ok(shodan_res, ([], {}))
+        apex_records = DNSRecords(a=a, aaaa=aaaa, cname=cname, txt=txt, mx=mx, ns=ns, srv=srv)
+        whois_info = WhoisInfo(
+            registrar=who.get("registrar"),
+            creation_date=who.get("creation_date"),
+            expiration_date=who.get("expiration_date"),
+            name_servers=list(who.get("name_servers") or []),
+        )
         # Merge apex A/AAAA records with SecurityTrails current DNS
         if st_dns:
-            a_merge = sorted(set((apex_records.a or []) + st_dns.get("a", [])))
-            aaaa_merge = sorted(set((apex_records.aaaa or []) + st_dns.get("aaaa", [])))
-            apex_records = DNSRecords(
-                a=a_merge,
-                aaaa=aaaa_merge,
-                cname=apex_records.cname,
-                txt=apex_records.txt,
-                mx=apex_records.mx,
-                ns=apex_records.ns,
-                srv=apex_records.srv,
+            apex_records = replace(
+                apex_records,
+                a=sorted(set(apex_records.a or ()).union(st_dns.get("a", ()))),
+                aaaa=sorted(set(apex_records.aaaa or ()).union(st_dns.get("aaaa", ()))),
             )
-    except Exception:
-        st_subs = st_subs or []
-    shodan_subs, shodan_records = ([], {})
-    if shodan.enabled():
-        if progress:
-            progress("Pulling Shodan domain data (subdomains & DNS records)…")
-        try:
-            shodan_subs, shodan_records = shodan.domain_info(domain)
-        except Exception:
-            shodan_subs, shodan_records = ([], {})
-    brute: List[str] = []
-    if bruteforce:
+        brute: List[str] = []
+        if bruteforce:
+            if progress:
+                progress("Running DNS bruteforce (~1000 common names)…")
+            brute = await brute_subdomains(domain, wordlist, concurrency=concurrency, anon=anon, client=http_client)
+        # Stream every source into one set rather than concatenating them first
+        merged = {domain}
+        for source in (hints, crt, tc, st_subs, shodan_subs, brute):
+            merged.update(source or ())
+        names = sorted(merged)
         if progress:
-            progress("Running DNS bruteforce (~1000 common names)…")
-        brute = await brute_subdomains(domain, wordlist, concurrency=concurrency, anon=anon, client=http_client)
-    crt = crt or []
-    tc = tc or []
-    st_subs = st_subs or []
-    shodan_subs = shodan_subs or []
-    brute = brute or []
-    names = sorted(set(hints + crt + tc + st_subs + shodan_subs + brute + [domain]))
-    if progress:
-        progress(f"Resolving {len(names)} names to collect DNS records and IPs…")
-    subfindings = await _resolve_all(names, anon=anon, client=http_client)
+            progress(f"Resolving {len(names)} names to collect DNS records and IPs…")
+        subfindings = await _resolve_all(names, anon=anon, client=http_client, concurrency=min(concurrency, 100), progress=progress)
+        # Open port numbers per finding, kept beside `ports` so merges are set lookups
+        open_ports: Dict[str, Set[int]] = {sf.name: set() for sf in subfindings}
 
-    # Enrich with OSINT (Shodan). No active host probing unless explicitly enabled.
-    if progress:
-        progress("Enriching with Shodan host data (ports/tech) for resolved IPs…")
-    await asyncio.gather(*(_enrich_with_shodan(sf, shodan) for sf in subfindings))
+        # Enrich with OSINT (Shodan). No active host probing unless explicitly enabled.
+        if shodan.enabled():
+            if progress:
+                progress("Enriching with Shodan host data (ports/tech) for resolved IPs…")
+            # Subdomains often share hosts (CDNs, shared hosting): look each IP up once
+            host_map = await _shodan_host_map((ip for sf in subfindings for ip in sf.ips), shodan, http_client, gate)
+            for sf in subfindings:
+                _enrich_with_shodan(sf, host_map, open_ports[sf.name])
 
-    # Optionally perform active scan if enabled by user flag
-    if active_scan:
-        if progress:
-            progress("Active scan enabled: probing TCP ports and HTTP services…")
-        from .ports import scan_ports, scan_udp_ports  # lazy import to avoid accidental usage otherwise
-        from .http_fingerprint import fingerprint_http  # lazy import
-        # Determine TCP/UDP targets
-        tcp_ports: List[int] = []
-        udp_ports: List[int] = []
-        if ports_list:
-            tcp_ports = _choose_ports(None, ports_list)
-        elif ports_preset == "tcp":
-            tcp_ports = list(range(1, 65536))
-        elif ports_preset == "udp":
-            udp_ports = list(range(1, 65536))
-        elif ports_preset == "all":
-            tcp_ports = list(range(1, 65536))
-            udp_ports = list(range(1, 65536))
-        else:
-            tcp_ports = _choose_ports(ports_preset, None)
-        async def _active(sf: SubdomainFinding):
-            socks_tuple = None
-            if socks_url:
-                # parse socks5://host:port -> (host, port)
-                try:
-                    host_port = socks_url.split("://",1)[1]
-                    host, port_s = host_port.split(":")
-                    socks_tuple = (host, int(port_s))
-                except Exception:
-                    socks_tuple = None
-            if tcp_ports:
-                if progress:
-                    progress(f"[dim]  → {sf.name}: scanning {len(tcp_ports)} TCP ports…[/]")
-                def _tcp_prog(done: int, total: int) -> None:
-                    if progress:
-                        progress(f"[dim]     {sf.name}: {done}/{total} TCP ports scanned…[/]")
-                port_states = await scan_ports(sf.name, tcp_ports, concurrency=concurrency, timeout=timeout, socks_proxy=socks_tuple, progress_cb=_tcp_prog, progress_interval=30.0)
+        # Optionally perform active scan if enabled by user flag
+        if active_scan:
+            if progress:
+                progress("Active scan enabled: probing TCP ports and HTTP services…")
+            from .http_fingerprint import fingerprint_http  # lazy import
+            # Determine TCP/UDP targets
+            tcp_ports: Sequence[int] = ()
+            udp_ports: Sequence[int] = ()
+            if ports_list:
+                tcp_ports = _choose_ports(None, ports_list)
+            elif ports_preset == "tcp":
+                tcp_ports = ALL_PORTS
+            elif ports_preset == "udp":
+                udp_ports = ALL_PORTS
+            elif ports_preset == "all":
+                tcp_ports = ALL_PORTS
+                udp_ports = ALL_PORTS
             else:
-                port_states = []
-            # UDP cannot be proxied over Tor; skip in anon mode
-            udp_states: List[tuple[int, bool]] = []
-            if udp_ports:
-                if anon:
-                    if progress:
-                        progress(f"[yellow]Skipping UDP scan for {sf.name} in anon mode (cannot route via Tor).[/]")
-                else:
+                tcp_ports = _choose_ports(ports_preset, None)
+            # Port state belongs to (ip, port), not to a name: subdomains sharing an address
+            # (CDNs, shared hosting) reuse one scan of it
+            port_scans: Dict[str, "asyncio.Future[Tuple[List[Tuple[int, bool]], List[Tuple[int, bool]]]]"] = {}
+            # Optional one-shot external TCP scan over every primary address (IPv4 only)
+            external = await _external_tcp(backend, (sf.ips[0] for sf in subfindings if sf.ips), tcp_ports, anon, progress)
+
+            async def _active(sf: SubdomainFinding):
+                if sf.ips:
+                    addr = sf.ips[0]
+                    fut = port_scans.get(addr)
+                    if fut is None:
+                        fut = port_scans[addr] = asyncio.ensure_future(_scan_address(
+                            addr, sf.name, tcp_ports, udp_ports, anon=anon, concurrency=concurrency,
+                            timeout=timeout, socks_tuple=socks_tuple, gate=gate, progress=progress,
+                            tcp_open=external.get(addr),
+                        ))
+                    port_states, udp_states = await fut
+                    # Merge: preserve OSINT-found open ports, add newly open ones
+                    _merge_port_states(sf, open_ports[sf.name], port_states, udp_states)
+                # Try HTTP fingerprint only for open web ports not already in http map
+                targets = _web_targets(open_ports[sf.name])
+                async def do_fp(p: int, ssl: bool):
+                    key = f"{p}/{ 'https' if ssl else 'http'}"
+                    if key in sf.http:
+                        return
                     if progress:
-                        progress(f"[dim]  → {sf.name}: scanning {len(udp_ports)} UDP ports…[/]")
-                    def _udp_prog(done: int, total: int) -> None:
-                        if progress:
-                            progress(f"[dim]     {sf.name}: {done}/{total} UDP ports scanned…[/]")
-                    udp_states = await scan_udp_ports(sf.name, udp_ports, concurrency=concurrency, timeout=max(1.0, timeout/2), progress_cb=_udp_prog, progress_interval=30.0)
-            # Merge: preserve OSINT-found open ports, add newly open ones
-            known = {p.port for p in sf.ports if p.open}
-            for p, state in port_states:
-                if state and p not in known:
-                    sf.ports.append(PortInfo(port=p, open=True, protocol="tcp"))
-            for p, state in udp_states:
-                if state and p not in known:
-                    sf.ports.append(PortInfo(port=p, open=True, protocol="udp"))
-            # Try HTTP fingerprint only for open web ports not already in http map
-            targets = []
-            for pinfo in sf.ports:
-                if not pinfo.open:
-                    continue
-                if pinfo.port in (80, 8080, 8000, 8888):
-                    targets.append((pinfo.port, False))
-                if pinfo.port in (443, 8443):
-                    targets.append((pinfo.port, True))
-            async def do_fp(p: int, ssl: bool):
-                key = f"{p}/{ 'https' if ssl else 'http'}"
-                if key in sf.http:
-                    return
-                if progress:
-                    scheme = 'https' if ssl else 'http'
-                    progress(f"[dim]  → {sf.name}: fingerprinting {scheme} on port {p}…[/]")
-                data = await fingerprint_http(sf.name, p, ssl, timeout=timeout, client=http_client)
-                if data:
-                    sf.http[key] = HTTPInfo(
-                        url=data.get("url", f"http://{sf.name}:{p}"),
-                        status=int(data["status"]) if data.get("status") and str(data["status"]).isdigit() else None,
-                        title=data.get("title"),
-                        server=data.get("server"),
-                        favicon_hash=data.get("favicon_hash"),
-                        tech=[t.strip() for t in (data.get("tech") or "").split(",") if t.strip()],
-                    )
-            await asyncio.gather(*(do_fp(p, ssl) for p, ssl in targets))
-    # Run active tasks for all subdomains when active_scan is requested (including anon via Tor)
-    if active_scan:
-        await asyncio.gather(*(_active(sf) for sf in subfindings))
-
-    # Cleanup after all network work is complete
-    if http_client:
-        await http_client.aclose()
-    if tor:
-        tor.stop()
+                        scheme = 'https' if ssl else 'http'
+                        progress(f"[dim]  → {sf.name}: fingerprinting {scheme} on port {p}…[/]")
+                    async with gate:
+                        data = await fingerprint_http(sf.name, p, ssl, timeout=timeout, client=http_client)
+                    if data:
+                        sf.http[key] = HTTPInfo(
+                            url=data.get("url", f"http://{sf.name}:{p}"),
+                            status=int(data["status"]) if data.get("status") and str(data["status"]).isdigit() else None,
+                            title=data.get("title"),
+                            server=data.get("server"),
+                            favicon_hash=data.get("favicon_hash"),
+                            tech=merge_tech_hints((data.get("tech") or "").split(",")),
+                        )
+                await asyncio.gather(*(do_fp(p, ssl) for p, ssl in targets))
+            # Run active tasks for all subdomains (including anon via Tor)
+            sub_gate = _subdomain_gate(len(tcp_ports) + len(udp_ports))
 
-    return ScanResult(domain=domain, whois=whois_info, records=apex_records, subdomains=subfindings)
+            async def _bounded(sf: SubdomainFinding):
+                async with sub_gate:
+                    await _active(sf)
 
+            await asyncio.gather(*(_bounded(sf) for sf in subfindings))
 
-async def run_scan_ip(ip: str, outdir: Path, ports_preset: Optional[str], ports_list: Optional[str], concurrency: int, timeout: float, active_scan: bool, progress: Optional[Callable[[str], None]] = None, anon: bool = False) -> ScanResult:
+        return ScanResult(domain=domain, whois=whois_info, records=apex_records, subdomains=subfindings)
+    finally:
+        # Release the pool, Shodan session and Tor even if a stage raised
+        await http_client.aclose()
+        shodan.close()
+        if tor:
+            tor.stop()
+
+
+async def run_scan_ip(ip: str, outdir: Path, ports_preset: Optional[str], ports_list: Optional[str], concurrency: int, timeout: float, active_scan: bool, progress: Optional[Callable[[str], None]] = None, anon: bool = False, backend: str = "asyncio") -> ScanResult:
     if progress:
         progress("Gathering reverse DNS (PTR) and passive IP intelligence…")
     settings = get_settings()
     tor: Optional[TorManager] = None
     socks_url = None
     http_client = None
+    shodan: Optional[ShodanClient] = None
     try:
         if anon:
             tor = TorManager()
@@ -295,119 +439,86 @@ async def run_scan_ip(ip: str, outdir: Path, ports_preset: Optional[str], ports_
                 if progress:
                     progress(f"[warning] Could not start Tor: {e}")
                 raise RuntimeError("--anon requested but Tor is not available/running. Install Tor or set TOR_EXE.")
-        if socks_url:
-            import httpx  # type: ignore[import]
-            proxies = {"http://": socks_url, "https://": socks_url}
-            http_client = httpx.AsyncClient(timeout=10.0, proxies=proxies)
-        # PTR and ThreatCrowd
-        ptrs = await ptr_lookup(ip, anon=anon, client=http_client)
-        from .passive_sources import from_threatcrowd_ip
-        tc = await from_threatcrowd_ip(ip, client=http_client)
-        # Shodan host to extract hostnames and ports
+        socks_tuple = _socks_tuple(socks_url)
+        http_client = _shared_client(socks_url, concurrency)
+        # One concurrency budget for every network-initiating stage (ports, HTTP)
+        gate = asyncio.Semaphore(concurrency)
+        # PTR, ThreatCrowd and Shodan host (hostnames and ports), concurrently
         shodan = ShodanClient(settings.shodan_api_key, proxies={"http": socks_url, "https": socks_url} if socks_url else None)
-        host = shodan.host_info(ip) if shodan.enabled() else None
-        hostnames: List[str] = sorted(set(ptrs + tc + (host.get("hostnames") if isinstance(host, dict) else []) or []))
+
+        async def _shodan_host() -> Optional[dict]:
+            return await shodan.host_info_async(ip, http_client) if shodan.enabled() else None
+
+        ptrs, tc, host = await asyncio.gather(
+            ptr_lookup(ip, anon=anon, client=http_client),
+            from_threatcrowd_ip(ip, client=http_client),
+            _shodan_host(),
+        )
+        # Every hostname below shares the one IP: reuse the single host lookup for all of them
+        host_map: Dict[str, Optional[dict]] = {ip: host}
+        merged = set(ptrs or ())
+        merged.update(tc or ())
+        if isinstance(host, dict):
+            merged.update(host.get("hostnames") or ())
+        hostnames: List[str] = sorted(merged)
         # Build findings
         subs: List[SubdomainFinding] = []
+        open_ports: Dict[str, Set[int]] = {}
         for hn in (hostnames or [ip]):
             name = hn if isinstance(hn, str) and hn else ip
             rec = DNSRecords(a=[ip], aaaa=[], cname=[], txt=[], mx=[], ns=[], srv=[])
             sf = SubdomainFinding(name=name, ips=[ip], dns=rec)
-            # Shodan ports
-            if isinstance(host, dict):
-                for item in host.get("data", []) or []:
-                    p = item.get("port")
-                    if isinstance(p, int):
-                        if p not in [pp.port for pp in sf.ports]:
-                            sf.ports.append(PortInfo(port=p, open=True, service=item.get("product")))
-                        http = item.get("http")
-                        if http:
-                            ssl = bool(item.get("ssl")) or p in (443, 8443)
-                            scheme = "https" if ssl else "http"
-                            key = f"{p}/{scheme}"
-                            if key not in sf.http:
-                                sf.http[key] = HTTPInfo(
-                                    url=f"{scheme}://{name}:{p}",
-                                    status=http.get("status") if isinstance(http.get("status"), int) else None,
-                                    title=http.get("title"),
-                                    server=http.get("server"),
-                                    tech=[t for t in [http.get("server"), item.get("product")] if t],
-                                )
+            # Shodan ports: same live-set merge as the domain scan
+            _enrich_with_shodan(sf, host_map, open_ports.setdefault(name, set()))
             subs.append(sf)
 
         # Optionally active scan the IP (over Tor if anon)
         if active_scan:
             if progress:
                 progress("Active scan enabled for IP: probing TCP ports and HTTP services…")
-            from .ports import scan_ports, scan_udp_ports
             from .http_fingerprint import fingerprint_http
-            tcp_ports: List[int] = []
-            udp_ports: List[int] = []
+            tcp_ports: Sequence[int] = ()
+            udp_ports: Sequence[int] = ()
             if ports_list:
                 tcp_ports = _choose_ports(None, ports_list)
             elif ports_preset == "tcp":
-                tcp_ports = list(range(1, 65536))
+                tcp_ports = ALL_PORTS
             elif ports_preset == "udp":
-                udp_ports = list(range(1, 65536))
+                udp_ports = ALL_PORTS
             elif ports_preset == "all":
-                tcp_ports = list(range(1, 65536))
-                udp_ports = list(range(1, 65536))
+                tcp_ports = ALL_PORTS
+                udp_ports = ALL_PORTS
             else:
                 tcp_ports = _choose_ports(ports_preset, None)
-            socks_tuple = None
-            if socks_url:
-                try:
-                    host_port = socks_url.split("://",1)[1]
-                    sh, sp = host_port.split(":")
-                    socks_tuple = (sh, int(sp))
-                except Exception:
-                    socks_tuple = None
+            fp_cache: Dict[Tuple[str, int, bool], "asyncio.Future[Optional[dict]]"] = {}
+
+            async def fingerprint(p: int, ssl: bool) -> Optional[dict]:
+                async with gate:
+                    return await fingerprint_http(ip, p, ssl, timeout=timeout, client=http_client)
+
+            # Every hostname shares the one address: scan it once for all of them
+            external = await _external_tcp(backend, (ip,), tcp_ports, anon, progress)
+            port_states, udp_states = await _scan_address(
+                ip, ip, tcp_ports, udp_ports, anon=anon, concurrency=concurrency,
+                timeout=timeout, socks_tuple=socks_tuple, gate=gate, progress=progress,
+                tcp_open=external.get(ip),
+            )
+
             async def scan_sf(sf: SubdomainFinding):
-                if tcp_ports:
-                    if progress:
-                        progress(f"[dim]  → {sf.name}: scanning {len(tcp_ports)} TCP ports…[/]")
-                    def _tcp_prog(done: int, total: int) -> None:
-                        if progress:
-                            progress(f"[dim]     {sf.name}: {done}/{total} TCP ports scanned…[/]")
-                    results = await scan_ports(ip, tcp_ports, concurrency=concurrency, timeout=timeout, socks_proxy=socks_tuple, progress_cb=_tcp_prog, progress_interval=30.0)
-                else:
-                    results = []
-                # UDP in anon mode is skipped
-                udp_results: List[tuple[int, bool]] = []
-                if udp_ports:
-                    if anon:
-                        if progress:
-                            progress(f"[yellow]Skipping UDP scan for {sf.name} in anon mode (cannot route via Tor).[/]")
-                    else:
-                        if progress:
-                            progress(f"[dim]  → {sf.name}: scanning {len(udp_ports)} UDP ports…[/]")
-                        def _udp_prog(done: int, total: int) -> None:
-                            if progress:
-                                progress(f"[dim]     {sf.name}: {done}/{total} UDP ports scanned…[/]")
-                        udp_results = await scan_udp_ports(ip, udp_ports, concurrency=concurrency, timeout=max(1.0, timeout/2), progress_cb=_udp_prog, progress_interval=30.0)
-                known = {p.port for p in sf.ports if p.open}
-                for p, state in results:
-                    if state and p not in known:
-                        sf.ports.append(PortInfo(port=p, open=True, protocol="tcp"))
-                for p, state in udp_results:
-                    if state and p not in known:
-                        sf.ports.append(PortInfo(port=p, open=True, protocol="udp"))
-                targets = []
-                for pinfo in sf.ports:
-                    if not pinfo.open:
-                        continue
-                    if pinfo.port in (80, 8080, 8000, 8888):
-                        targets.append((pinfo.port, False))
-                    if pinfo.port in (443, 8443):
-                        targets.append((pinfo.port, True))
+                _merge_port_states(sf, open_ports[sf.name], port_states, udp_states)
+                targets = _web_targets(open_ports[sf.name])
                 async def do_fp(p: int, ssl: bool):
                     key = f"{p}/{ 'https' if ssl else 'http'}"
                     if key in sf.http:
                         return
-                    if progress:
-                        scheme = 'https' if ssl else 'http'
-                        progress(f"[dim]  → {sf.name}: fingerprinting {scheme} on port {p}…[/]")
-                    data = await fingerprint_http(ip, p, ssl, timeout=timeout, client=http_client)
+                    # Every hostname probes the same ip:port, so fetch it once and share the result
+                    fut = fp_cache.get((ip, p, ssl))
+                    if fut is None:
+                        if progress:
+                            scheme = 'https' if ssl else 'http'
+                            progress(f"[dim]  → {ip}: fingerprinting {scheme} on port {p}…[/]")
+                        fut = fp_cache[(ip, p, ssl)] = asyncio.ensure_future(fingerprint(p, ssl))
+                    data = await fut
                     if data:
                         sf.http[key] = HTTPInfo(
                             url=data.get("url", f"http://{ip}:{p}"),
@@ -415,7 +526,7 @@ async def run_scan_ip(ip: str, outdir: Path, ports_preset: Optional[str], ports_
                             title=data.get("title"),
                             server=data.get("server"),
                             favicon_hash=data.get("favicon_hash"),
-                            tech=[t.strip() for t in (data.get("tech") or "").split(",") if t.strip()],
+                            tech=merge_tech_hints((data.get("tech") or "").split(",")),
                         )
                 await asyncio.gather(*(do_fp(p, ssl) for p, ssl in targets))
             await asyncio.gather(*(scan_sf(sf) for sf in subs))
@@ -426,10 +537,51 @@ async def run_scan_ip(ip: str, outdir: Path, ports_preset: Optional[str], ports_
     finally:
         if http_client:
             await http_client.aclose()
+        if shodan:
+            shodan.close()
         if tor:
             tor.stop()
 
 
+def _run(coro):
+    """asyncio.run, on uvloop when the optional 'fast' extra is installed (not on Windows)."""
+    try:
+        import uvloop  # type: ignore
+    except ImportError:
+        return asyncio.run(coro)
+    return uvloop.run(coro)
+
+
+def _write_json(outdir: Path, result: ScanResult) -> None:
+    # orjson serializes dataclasses natively (no asdict() deep copy) straight to bytes,
+    # so the only full-size buffer is the encoded output handed to the file
+    outdir.mkdir(parents=True, exist_ok=True)
+    with (outdir / "result.json").open("wb") as f:
+        f.write(orjson.dumps(result, default=json_default, option=orjson.OPT_INDENT_2))
+
+
+def _finish(
+    outdir: Path,
+    tmpl_dir: Path,
+    result: ScanResult,
+    write_json: bool,
+    progress: Optional[Callable[[str], None]],
+) -> Path:
+    """Render/write the HTML report while a worker thread dumps JSON; both only read `result`."""
+    if progress:
+        progress("Rendering HTML report and writing JSON…")
+    context = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "result": result,
+    }
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        json_job = pool.submit(_write_json, outdir, result) if write_json else None
+        path = write_report(outdir, render_report(tmpl_dir, context))
+        if json_job:
+            json_job.result()
+    return path
+
+
 def scan_domain(
     domain: str,
     outdir: Optional[Path] = None,
@@ -443,6 +595,9 @@ def scan_domain(
     active: bool = False,
     progress: Optional[Callable[[str], None]] = None,
     anon: bool = False,
+    cache: Optional[bool] = None,
+    refresh: bool = False,
+    backend: str = "asyncio",
 ) -> Path:
     outdir = outdir or Path("reports") / f"{domain}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}"
     project_root = Path(__file__).resolve().parents[2]
@@ -456,21 +611,10 @@ def scan_domain(
             with pkg_resources.as_file(pkg_resources.files("enumtool.resources") / "subdomains-top.txt") as p:
                 wordlist = Path(str(p))
 
-    result = asyncio.run(run_scan(domain, outdir, ports, ports_list, wordlist, bruteforce, concurrency, timeout, active, progress, anon))
-    # Render HTML
-    if progress:
-        progress("Rendering HTML report…")
-    html = render_report(tmpl_dir, {
-        "generated_at": datetime.utcnow().isoformat() + "Z",
-        "result": result,
-    })
-    if progress:
-        progress("Writing report files (HTML/JSON)…")
-    path = write_report(outdir, html)
-
-    if write_json:
-        (outdir / "result.json").write_text(json.dumps(asdict(result), indent=2), encoding="utf-8")
-    return path
+    # Off under --anon unless asked for: cache entries are a plaintext trail of targets
+    configure_cache(enabled=(not anon) if cache is None else cache, refresh=refresh)
+    result = _run(run_scan(domain, outdir, ports, ports_list, wordlist, bruteforce, concurrency, timeout, active, progress, anon, backend))
+    return _finish(outdir, tmpl_dir, result, write_json, progress)
 
 
 def scan_ip(
@@ -484,21 +628,15 @@ def scan_ip(
     active: bool = False,
     progress: Optional[Callable[[str], None]] = None,
     anon: bool = False,
+    cache: Optional[bool] = None,
+    refresh: bool = False,
+    backend: str = "asyncio",
 ) -> Path:
     outdir = outdir or Path("reports") / f"{ip}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}"
     project_root = Path(__file__).resolve().parents[2]
     tmpl_dir = project_root / "templates"
 
-    result = asyncio.run(run_scan_ip(ip, outdir, ports, ports_list, concurrency, timeout, active, progress, anon))
-    if progress:
-        progress("Rendering HTML report…")
-    html = render_report(tmpl_dir, {
-        "generated_at": datetime.utcnow().isoformat() + "Z",
-        "result": result,
-    })
-    if progress:
-        progress("Writing report files (HTML/JSON)…")
-    path = write_report(outdir, html)
-    if write_json:
-        (outdir / "result.json").write_text(json.dumps(asdict(result), indent=2), encoding="utf-8")
-    return path
+    # Off under --anon unless asked for: cache entries are a plaintext trail of targets
+    configure_cache(enabled=(not anon) if cache is None else cache, refresh=refresh)
+    result = _run(run_scan_ip(ip, outdir, ports, ports_list, concurrency, timeout, active, progress, anon, backend))
+    return _finish(outdir, tmpl_dir, result, write_json, progress)
@@ -1,21 +1,53 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+import asyncio
 import os
 import time
 import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import cached
+if TYPE_CHECKING:
+    import httpx
 
 SHODAN_API_BASE = "https://api.shodan.io"
+# One retry policy for the sync and async paths: rate limits and flaky gateways only
+RETRY_STATUS = frozenset({429, 502, 503})
+RETRIES = 2
+RETRY_BACKOFF = 0.5
+
+
+def _retry_delay(status: int, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying a response with this status, or None to stop."""
+    if status in RETRY_STATUS and attempt < RETRIES:
+        return RETRY_BACKOFF * (2 ** attempt)
+    return None
 
 
 class ShodanClient:
     def __init__(self, api_key: Optional[str], proxies: Optional[dict] = None):
         self.api_key = api_key
         self._proxies = proxies
+        self._session: Optional[requests.Session] = None
+
+    def _sync_session(self) -> requests.Session:
+        # Scans use the async path; only sync callers pay for a pooled keep-alive session
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.headers["Accept"] = "application/json"
+            self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=64))
+        return self._session
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
     def enabled(self) -> bool:
         return bool(self.api_key)
 
+    @cached("shodan")
     def _get(self, path: str, params: Optional[Dict[str, str]] = None) -> Optional[Dict]:
         if not self.enabled():
             return None
@@ -24,20 +56,51 @@ class ShodanClient:
         if params:
             qp.update(params)
         try:
-            r = requests.get(url, params=qp, timeout=10, proxies=self._proxies)
-            if r.status_code == 429:
-                # Simple one-shot backoff
-                time.sleep(1)
-                r = requests.get(url, params=qp, timeout=10, proxies=self._proxies)
+            session = self._sync_session()
+            for attempt in range(RETRIES + 1):
+                r = session.get(url, params=qp, timeout=10, proxies=self._proxies)
+                delay = _retry_delay(r.status_code, attempt)
+                if delay is None:
+                    break
+                time.sleep(delay)
             if r.ok:
                 return r.json()
         except Exception:
             return None
         return None
 
+    @cached("shodan")
+    async def _aget(self, client: "httpx.AsyncClient", path: str, params: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """Async twin of _get over the caller's (pooled, possibly Tor-routed) httpx client."""
+        if not self.enabled():
+            return None
+        url = f"{SHODAN_API_BASE}{path}"
+        qp = {"key": self.api_key}
+        if params:
+            qp.update(params)
+        try:
+            for attempt in range(RETRIES + 1):
+                r = await client.get(url, params=qp, timeout=10)
+                delay = _retry_delay(r.status_code, attempt)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+            if r.is_success:
+                return r.json()
+        except Exception:
+            return None
+        return None
+
     def domain_info(self, domain: str) -> Tuple[List[str], Dict[str, List[str]]]:
         """Return (subdomains, dns_records_by_type) via /dns/domain endpoint."""
-        data = self._get(f"/dns/domain/{domain}")
+        return self._parse_domain(domain, self._get(f"/dns/domain/{domain}"))
+
+    async def domain_info_async(self, domain: str, client: "httpx.AsyncClient") -> Tuple[List[str], Dict[str, List[str]]]:
+        """domain_info without blocking the event loop."""
+        return self._parse_domain(domain, await self._aget(client, f"/dns/domain/{domain}"))
+
+    @staticmethod
+    def _parse_domain(domain: str, data: Optional[Dict]) -> Tuple[List[str], Dict[str, List[str]]]:
         subs: List[str] = []
         records: Dict[str, List[str]] = {}
         if not data:
@@ -57,3 +120,7 @@ class ShodanClient:
     def host_info(self, ip: str) -> Optional[Dict]:
         """Return Shodan host info for an IP, including ports and service banners."""
         return self._get(f"/shodan/host/{ip}")
+
+    async def host_info_async(self, ip: str, client: "httpx.AsyncClient") -> Optional[Dict]:
+        """host_info without blocking the event loop."""
+        return await self._aget(client, f"/shodan/host/{ip}")
@@ -1,24 +1,20 @@
 from __future__ import annotations
 
-import asyncio
+import re
+from itertools import chain, islice
 from pathlib import Path
-from typing import Iterable, List, Set, Optional, TYPE_CHECKING
+from typing import Iterable, List, Set, Optional, Tuple, TYPE_CHECKING
 
-from .dns_utils import enumerate_dns, enumerate_dns_doh
+from .dns_utils import enumerate_dns, enumerate_dns_doh, resolve_existing_many
 if TYPE_CHECKING:
     import httpx
 
-
-async def _exists(name: str, *, anon: bool = False, client: Optional["httpx.AsyncClient"] = None) -> bool:
-    if anon:
-        a, aaaa, cname, *_ = await enumerate_dns_doh(name, client)
-    else:
-        a, aaaa, cname, *_ = await enumerate_dns(name)
-    return bool(a or aaaa or cname)
+# Host-like runs inside TXT data: pulls "_spf.example.com" out of "include:_spf.example.com"
+_HOST_RE = re.compile(r"[A-Za-z0-9_-]+(?:\.[A-Za-z0-9_-]+)+")
 
 
-def _expand_to_top_1000(base_words: List[str]) -> List[str]:
-    # Ensure unique and prioritized common seeds first
+def _build_static_expansion() -> Tuple[str, ...]:
+    """Seeds plus generated variants, deduped in priority order. Runs once at import."""
     seeds = [
         "www","mail","smtp","imap","pop","webmail","ns","ns1","ns2","dns","mx","autodiscover",
         "api","app","dev","test","qa","stage","staging","prod","beta","alpha","demo","sandbox",
@@ -29,18 +25,8 @@ def _expand_to_top_1000(base_words: List[str]) -> List[str]:
         "rabbitmq","k8s","kubernetes","istio","argocd","vault","consul","sonar","sonarqube","nginx","apache","iis",
         "tomcat","node","python","php","java","go","react","next","angular","vue","sso2","mobile","m",
     ]
-    # Start from file-provided base words, then seeds
-    base = []
-    base.extend(base_words)
-    base.extend(seeds)
-    seen: Set[str] = set()
-    out: List[str] = []
-    def add(w: str):
-        if w and w not in seen:
-            seen.add(w)
-            out.append(w)
-    for w in base:
-        add(w)
+    out: List[str] = list(seeds)
+    add = out.append
     # Numeric suffixes for common patterns
     common_numeric = [
         "www","mail","api","app","dev","test","stage","staging","cdn","static","img","media","files",
@@ -63,35 +49,30 @@ def _expand_to_top_1000(base_words: List[str]) -> List[str]:
     for e in envs:
         for w in ["api","app","web","admin","portal","cdn","static","assets","auth","sso","git","jenkins","db","sql","files","media","docs","status","monitor","vpn"]:
             add(f"{e}-{w}")
-    # Trim to top ~1000
-    return out[:1000]
+    return tuple(dict.fromkeys(out))
+
+
+_STATIC_EXPANSION: Tuple[str, ...] = _build_static_expansion()
+
+
+def _expand_to_top_1000(base_words: List[str]) -> List[str]:
+    # File-provided base words first, then the precomputed expansion; trim to top ~1000
+    return list(islice(dict.fromkeys(chain(base_words, _STATIC_EXPANSION)), 1000))
 
 
 async def brute_subdomains(domain: str, wordlist_path: Path, concurrency: int = 200, *, anon: bool = False, client: Optional["httpx.AsyncClient"] = None) -> List[str]:
-    words: List[str] = []
     try:
-        with wordlist_path.open("r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                w = line.strip()
-                if not w or w.startswith("#"):
-                    continue
-                words.append(w)
+        raw = wordlist_path.read_text(encoding="utf-8", errors="ignore")
     except FileNotFoundError:
         return []
+    words = [w for w in map(str.strip, raw.splitlines()) if w and not w.startswith("#")]
     # Expand to approximately top 1000 common patterns
     words = _expand_to_top_1000(words)
 
-    sem = asyncio.Semaphore(concurrency)
-    results: List[str] = []
-
-    async def worker(sub: str):
-        fqdn = f"{sub}.{domain}".strip()
-        async with sem:
-            if await _exists(fqdn, anon=anon, client=client):
-                results.append(fqdn)
-
-    await asyncio.gather(*(worker(w) for w in words))
-    return sorted(set(results))
+    # One bulk existence pass (A/AAAA only) rather than a full seven-record walk per candidate
+    candidates = [f"{sub}.{domain}".strip() for sub in words]
+    found = await resolve_existing_many(candidates, concurrency, anon=anon, client=client)
+    return sorted(found)
 
 
 async def passive_hints(domain: str, *, anon: bool = False, client: Optional["httpx.AsyncClient"] = None) -> List[str]:
@@ -100,16 +81,12 @@ async def passive_hints(domain: str, *, anon: bool = False, client: Optional["ht
         _, _, cname, txt, mx, ns, _ = await enumerate_dns_doh(domain, client)
     else:
         _, _, cname, txt, mx, ns, _ = await enumerate_dns(domain)
-    hints: Set[str] = set()
-    candidates = []
-    candidates += [r.split()[-1].strip(".") for r in mx]
+    candidates = [r.split()[-1].strip(".") for r in mx]
     candidates += [r.strip(".") for r in ns]
     candidates += [r.strip(".") for r in cname]
     for t in txt:
-        for token in t.replace("\"", "").split():
-            if token.endswith(domain) and "." in token:
-                candidates.append(token.strip("."))
-    for c in candidates:
-        if c.endswith(domain):
-            hints.add(c)
+        candidates += _HOST_RE.findall(t)
+    # The apex itself or a true subdomain: a bare endswith(domain) would also accept "evil" + domain
+    suffix = "." + domain
+    hints: Set[str] = {c for c in candidates if c == domain or c.endswith(suffix)}
     return sorted(hints)
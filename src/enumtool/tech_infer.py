@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import Iterable, Optional, Tuple
 
 
-def merge_tech_hints(*hint_groups: Iterable[str]) -> List[str]:
+def merge_tech_hints(*hint_groups: Iterable[Optional[str]]) -> Tuple[str, ...]:
+    """Union of hint groups as a sorted, immutable tuple; blank entries are dropped."""
     out = set()
     for g in hint_groups:
         for h in g:
-            if not h:
-                continue
-            out.add(h)
-    return sorted(out)
+            if h:
+                h = h.strip()
+                if h:
+                    out.add(h)
+    return tuple(sorted(out))
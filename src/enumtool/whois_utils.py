@@ -2,12 +2,22 @@ from __future__ import annotations
 
 from typing import Optional
 
+from .cache import WHOIS_TTL, cached
+
 try:
     import whois  # type: ignore
 except Exception:  # pragma: no cover - optional dep resolution issues
     whois = None  # type: ignore
 
 
+def _iso(v) -> Optional[str]:
+    """ISO 8601 for dates/datetimes, plain str otherwise; None stays None."""
+    if v is None:
+        return None
+    return v.isoformat() if hasattr(v, "isoformat") else str(v)
+
+
+@cached("whois", WHOIS_TTL)
 def fetch_whois(domain: str) -> dict:
     if whois is None:
         return {}
@@ -16,10 +26,13 @@ def fetch_whois(domain: str) -> dict:
         # Convert complex types to strings
         out = {}
         for k, v in data.items():
-            if isinstance(v, (list, tuple)) and v:
-                out[k] = str(v[0])
+            if k == "name_servers":
+                # Keep every server, not just the first
+                out[k] = [str(ns) for ns in (v if isinstance(v, (list, tuple)) else [v]) if ns]
+            elif isinstance(v, (list, tuple)) and v:
+                out[k] = _iso(v[0])
             else:
-                out[k] = str(v) if v is not None else None
+                out[k] = _iso(v)
         return out
     except Exception:
         return {}